@@ -0,0 +1,65 @@
+"""Composite and partial indexes for the hot query shapes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 02:40:12.118204
+
+- ix_time_entries_user_open:      user_id = ? AND clock_out_time IS NULL
+- ix_time_entries_user_clock_in:  user_id = ? ORDER BY clock_in_time DESC
+- ix_time_entries_open:           clock_out_time IS NULL
+- ix_vacation_requests_pending_created: status = 'PENDING' ORDER BY created_at DESC
+- ix_vacation_requests_user_created:    user_id = ? ORDER BY created_at DESC
+
+On PostgreSQL the indexes are built CONCURRENTLY so clock-ins keep working
+while the migration runs.
+"""
+from contextlib import nullcontext
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_ENTRY = sa.text("clock_out_time IS NULL")
+PENDING = sa.text("status = 'PENDING'")
+
+INDEXES = [
+    ("ix_time_entries_user_open", "time_entries", ["user_id"], OPEN_ENTRY),
+    ("ix_time_entries_user_clock_in", "time_entries", ["user_id", "clock_in_time", "id"], None),
+    ("ix_time_entries_open", "time_entries", ["location_id", "clock_in_time"], OPEN_ENTRY),
+    ("ix_vacation_requests_pending_created", "vacation_requests", ["created_at", "id"], PENDING),
+    ("ix_vacation_requests_user_created", "vacation_requests", ["user_id", "created_at", "id"], None),
+]
+
+
+def _concurrently() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    concurrently = _concurrently()
+    with op.get_context().autocommit_block() if concurrently else nullcontext():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=where,
+                sqlite_where=where,
+                postgresql_concurrently=concurrently,
+            )
+
+
+def downgrade() -> None:
+    concurrently = _concurrently()
+    with op.get_context().autocommit_block() if concurrently else nullcontext():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=concurrently)
+
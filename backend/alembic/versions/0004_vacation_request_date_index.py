@@ -0,0 +1,47 @@
+"""Date-range index for the vacation coverage calendar
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 03:10:41.520337
+
+- ix_vacation_requests_date: date BETWEEN ? AND ? AND status IN (...)
+
+On PostgreSQL the index is built CONCURRENTLY.
+"""
+from contextlib import nullcontext
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _concurrently() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    concurrently = _concurrently()
+    with op.get_context().autocommit_block() if concurrently else nullcontext():
+        op.create_index(
+            "ix_vacation_requests_date",
+            "vacation_requests",
+            ["date", "status"],
+            unique=False,
+            postgresql_concurrently=concurrently,
+        )
+
+
+def downgrade() -> None:
+    concurrently = _concurrently()
+    with op.get_context().autocommit_block() if concurrently else nullcontext():
+        op.drop_index(
+            "ix_vacation_requests_date",
+            table_name="vacation_requests",
+            postgresql_concurrently=concurrently,
+        )
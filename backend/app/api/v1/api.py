@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1 import auth, users, time_entries, locations, vacation_requests
+from app.api.v1 import auth, users, time_entries, locations, vacation_requests, dashboard
 
 api_router = APIRouter()
 
@@ -9,3 +9,4 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(time_entries.router, prefix="/time-entries", tags=["time-entries"])
 api_router.include_router(locations.router, prefix="/locations", tags=["locations"])
 api_router.include_router(vacation_requests.router, prefix="/vacation-requests", tags=["vacation-requests"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
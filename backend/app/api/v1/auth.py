@@ -1,23 +1,29 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token
+from app.core.auth import Principal, require_manager
+from app.core.security import create_access_token, password_hasher, verify_password_async
 from app.models.user import User
 from app.schemas.user import UserLogin, Token
 
 router = APIRouter()
 
-@router.post("/login", response_model=Token)
-async def login(
-    user_credentials: UserLogin,
-    db: Session = Depends(get_db)
-):
-    """Login user and return access token"""
-    user = db.query(User).filter(User.email == user_credentials.email).first()
+async def issue_token(db: AsyncSession, email: str, password: str) -> dict:
+    """
+    Check credentials and return a bearer token. The user's row is copied
+    out and the connection handed back to the pool before bcrypt runs, so
+    logins queued for the hashing pool do not hold database connections.
+    """
+    result = await db.execute(
+        select(User.email, User.hashed_password, User.is_active).where(User.email == email)
+    )
+    user = result.first()
+    await db.commit()
     
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    if not user or not await verify_password_async(password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -33,26 +39,25 @@ async def login(
     access_token = create_access_token(data={"sub": user.email})
     return {"access_token": access_token, "token_type": "bearer"}
 
+@router.post("/login", response_model=Token)
+async def login(
+    user_credentials: UserLogin,
+    db: AsyncSession = Depends(get_db)
+):
+    """Login user and return access token"""
+    return await issue_token(db, user_credentials.email, user_credentials.password)
+
 @router.post("/login-form", response_model=Token)
 async def login_form(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login using form data (for Swagger UI)"""
-    user = db.query(User).filter(User.email == form_data.username).first()
-    
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Inactive user"
-        )
-    
-    access_token = create_access_token(data={"sub": user.email})
-    return {"access_token": access_token, "token_type": "bearer"}
+    return await issue_token(db, form_data.username, form_data.password)
+
+@router.get("/hasher/stats")
+async def get_password_hasher_stats(
+    current_user: Principal = Depends(require_manager)
+):
+    """Get password hashing pool concurrency and queue metrics (manager only)"""
+    return password_hasher.stats()
@@ -0,0 +1,75 @@
+from typing import List, Optional
+
+from app.core.auth import Principal, require_manager
+from app.core.database import get_db
+from app.core.pagination import MAX_PAGE_SIZE, fetch_page
+from app.core.serialization import json_list_response
+from app.models.location import Location
+from app.models.time_entry import TimeEntry
+from app.models.user import User
+from app.models.vacation_request import VacationRequest, VacationStatus
+from app.schemas.dashboard import ActiveEntryDetail, PendingVacationDetail
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+router = APIRouter()
+
+# Related rows are loaded with one extra IN query per relationship, so every
+# endpoint here runs a fixed number of queries however many rows it returns
+USER_COLUMNS = (User.id, User.full_name, User.email, User.role)
+LOCATION_COLUMNS = (
+    Location.id,
+    Location.name,
+    Location.latitude,
+    Location.longitude,
+    Location.radius_meters,
+)
+
+
+@router.get("/active-employees", response_model=List[ActiveEntryDetail])
+async def get_active_employees(
+    location_id: Optional[int] = None,
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get open time entries with their user and location (manager only)"""
+    query = (
+        select(TimeEntry)
+        .where(TimeEntry.clock_out_time.is_(None))
+        .options(
+            selectinload(TimeEntry.user).load_only(*USER_COLUMNS),
+            selectinload(TimeEntry.location).load_only(*LOCATION_COLUMNS),
+        )
+        .order_by(TimeEntry.clock_in_time)
+    )
+    if location_id is not None:
+        query = query.where(TimeEntry.location_id == location_id)
+
+    result = await db.scalars(query)
+    return json_list_response(ActiveEntryDetail, result.all())
+
+
+@router.get("/pending-vacations", response_model=List[PendingVacationDetail])
+async def get_pending_vacations(
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get pending vacation requests with their requester (manager only)"""
+    requests, _ = await fetch_page(
+        db,
+        select(VacationRequest)
+        .where(VacationRequest.status == VacationStatus.PENDING)
+        .options(selectinload(VacationRequest.user).load_only(*USER_COLUMNS)),
+        [VacationRequest.created_at, VacationRequest.id],
+        response,
+        cursor=cursor,
+        limit=limit,
+        descending=True,
+    )
+
+    return json_list_response(PendingVacationDetail, requests, response)
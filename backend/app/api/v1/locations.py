@@ -1,72 +1,175 @@
-from typing import List
+from typing import List, Optional
 
-from app.core.auth import get_current_active_user, require_manager
+from app.core.auth import Principal, get_current_active_user, require_manager
+from app.core.cache import response_cache
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.etag import cache_etag, conditional_response
+from app.core.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, fetch_page
+from app.core.serialization import json_list_response
 from app.models.location import Location
-from app.models.user import User
-from app.schemas.location import LocationCreate, LocationResponse, LocationUpdate
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from app.models.time_entry import TimeEntry
+from app.schemas.location import (LocationCreate, LocationResponse,
+                                  LocationUpdate, NearbyLocationResponse)
+from app.services.location_index import location_index
+from app.services.location_registry import location_registry
+from fastapi import (APIRouter, Depends, Header, HTTPException, Query, Response,
+                     status)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
-
 @router.get("/", response_model=List[LocationResponse])
 async def get_locations(
-    skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get all active locations"""
-    locations = (
-        db.query(Location)
-        .filter(Location.is_active == True)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    cache_key = await response_cache.entry_key(
+        "locations", response_cache.key(current_user.role, "active", skip, limit, cursor)
+    )
+    etag = cache_etag(cache_key)
+    if etag is not None:
+        not_modified = conditional_response(response, etag, if_none_match)
+        if not_modified is not None:
+            return not_modified
+
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        if cached["next_cursor"]:
+            response.headers[NEXT_CURSOR_HEADER] = cached["next_cursor"]
+        return cached["items"]
+
+    locations, next_cursor = await fetch_page(
+        db,
+        select(Location).where(Location.is_active == True),
+        [Location.id],
+        response,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+    await response_cache.set(
+        cache_key,
+        {
+            "items": [LocationResponse.model_validate(location) for location in locations],
+            "next_cursor": next_cursor,
+        },
+        ttl=settings.CACHE_TTL_LOCATIONS,
     )
     return locations
 
 
 @router.get("/all", response_model=List[LocationResponse])
 async def get_all_locations(
-    skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(require_manager),
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get all locations (including inactive) - manager only"""
-    locations = db.query(Location).offset(skip).limit(limit).all()
-    return locations
+    locations, _ = await fetch_page(
+        db, select(Location), [Location.id], response, cursor=cursor, skip=skip, limit=limit
+    )
+    return json_list_response(LocationResponse, locations, response)
 
 
 @router.post("/", response_model=LocationResponse)
 async def create_location(
     location_data: LocationCreate,
-    current_user: User = Depends(require_manager),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create new location (manager only)"""
     location = Location(**location_data.dict())
     db.add(location)
-    db.commit()
-    db.refresh(location)
+    await db.commit()
+    await db.refresh(location)
+    location_index.upsert(location)
+    location_registry.refresh(location)
+    await response_cache.invalidate("locations")
     return location
 
 
+@router.get("/nearby", response_model=List[NearbyLocationResponse])
+async def get_nearby_locations(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    k: int = Query(5, ge=1, le=100),
+    max_m: Optional[float] = Query(None, gt=0),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the k closest active locations with their distances"""
+    await location_index.ensure_loaded(db)
+    matches = location_index.nearest(lat, lng, k=k, max_meters=max_m)
+    if not matches:
+        return []
+
+    result = await db.scalars(
+        select(Location).where(
+            Location.id.in_([location_id for location_id, _ in matches])
+        )
+    )
+    locations = {location.id: location for location in result}
+    return [
+        NearbyLocationResponse(
+            **LocationResponse.model_validate(locations[location_id]).model_dump(),
+            distance_meters=round(distance, 1),
+        )
+        for location_id, distance in matches
+        if location_id in locations
+    ]
+
+
+@router.get("/registry/stats")
+async def get_location_registry_stats(
+    current_user: Principal = Depends(require_manager),
+):
+    """Get hit/miss counters of the in-process location registry (manager only)"""
+    return location_registry.stats()
+
+
 @router.get("/{location_id}", response_model=LocationResponse)
 async def get_location(
     location_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get location by ID"""
-    location = db.query(Location).filter(Location.id == location_id).first()
+    cache_key = await response_cache.entry_key(
+        "locations", response_cache.key(current_user.role, location_id)
+    )
+    etag = cache_etag(cache_key)
+    if etag is not None:
+        not_modified = conditional_response(response, etag, if_none_match)
+        if not_modified is not None:
+            return not_modified
+
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    location = await db.get(Location, location_id)
     if not location:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Location not found"
         )
+    await response_cache.set(
+        cache_key,
+        LocationResponse.model_validate(location),
+        ttl=settings.CACHE_TTL_LOCATIONS,
+    )
     return location
 
 
@@ -74,11 +177,11 @@ async def get_location(
 async def update_location(
     location_id: int,
     location_data: LocationUpdate,
-    current_user: User = Depends(require_manager),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update location (manager only)"""
-    location = db.query(Location).filter(Location.id == location_id).first()
+    location = await db.get(Location, location_id)
     if not location:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Location not found"
@@ -88,31 +191,34 @@ async def update_location(
     for field, value in location_data.dict(exclude_unset=True).items():
         setattr(location, field, value)
 
-    db.commit()
-    db.refresh(location)
+    await db.commit()
+    await db.refresh(location)
+    location_index.upsert(location)
+    location_registry.refresh(location)
+    await response_cache.invalidate("locations")
     return location
 
 
 @router.delete("/{location_id}")
 async def delete_location(
     location_id: int,
-    current_user: User = Depends(require_manager),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db),
 ):
     """Delete location (manager only)"""
-    location = db.query(Location).filter(Location.id == location_id).first()
+    location = await db.get(Location, location_id)
     if not location:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Location not found"
         )
 
     # Check if location has active time entries
-    active_entries = (
-        db.query(TimeEntry)
-        .filter(
-            TimeEntry.location_id == location_id, TimeEntry.time.is_(None)
+    active_entries = await db.scalar(
+        select(TimeEntry)
+        .where(
+            TimeEntry.location_id == location_id, TimeEntry.clock_out_time.is_(None)
         )
-        .first()
+        .limit(1)
     )
 
     if active_entries:
@@ -121,7 +227,10 @@ async def delete_location(
             detail="Cannot delete location with active time entries",
         )
 
-    db.delete(location)
-    db.commit()
+    await db.delete(location)
+    await db.commit()
+    location_index.remove(location_id)
+    location_registry.invalidate(location_id)
+    await response_cache.invalidate("locations")
 
     return {"message": "Location deleted successfully"}
@@ -1,64 +1,107 @@
-from datetime import datetime
-from typing import List
-
-from app.core.auth import get_current_active_user, require_manager
-from app.core.database import get_db
+import asyncio
+from datetime import date, datetime
+from typing import List, Optional
+
+from app.core.auth import (Principal, authenticate_token, get_current_active_user,
+                           require_manager)
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.pagination import MAX_PAGE_SIZE, fetch_page
+from app.core.serialization import json_list_response, json_rows_response
+from app.core.timeutils import to_utc_naive
+from app.models.location import Location
 from app.models.time_entry import TimeEntry
-from app.models.user import User
-from app.schemas.time_entry import (ClockInRequest, ClockOutRequest,
-                                    TimeEntryResponse, TimeEntryUpdate)
+from app.schemas.time_entry import (BatchPunchRequest, BatchPunchResponse,
+                                    ClockInRequest, ClockOutRequest,
+                                    ExportFormat, HoursReportRow,
+                                    PresenceEventType, ReportPeriod,
+                                    TimeEntryResponse,
+                                    TimeEntryUpdate, TimesheetSummary)
+from app.services.export_service import MEDIA_TYPES, ExportService
+from app.services.group_commit import commit_time_entry_write
 from app.services.location_service import LocationService
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from app.services.presence import (CLOSED, load_snapshot, presence_broker,
+                                   presence_entry)
+from app.services.punch_sync_service import PunchSyncService
+from app.services.rollup_service import RollupService
+from app.services.timesheet_service import TimesheetService
+from fastapi import (APIRouter, Depends, HTTPException, Query, Response,
+                     WebSocket, WebSocketDisconnect, status)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
+# TimeEntryResponse fields as plain columns, for endpoints that skip the ORM
+TIME_ENTRY_RESPONSE_COLUMNS = (
+    TimeEntry.location_id,
+    TimeEntry.notes,
+    TimeEntry.id,
+    TimeEntry.user_id,
+    TimeEntry.clock_in_time,
+    TimeEntry.clock_in_latitude,
+    TimeEntry.clock_in_longitude,
+    TimeEntry.clock_in_accuracy,
+    TimeEntry.clock_out_time,
+    TimeEntry.clock_out_latitude,
+    TimeEntry.clock_out_longitude,
+    TimeEntry.clock_out_accuracy,
+    TimeEntry.duration_minutes.label("duration_minutes"),
+    TimeEntry.clock_out_time.is_(None).label("is_active"),
+    TimeEntry.created_at,
+    TimeEntry.updated_at,
+)
+
 
 @router.post("/clock-in", response_model=TimeEntryResponse)
 async def clock_in(
     request: ClockInRequest,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Clock in at a specific location"""
-    # Check if user is already clocked in
-    active_entry = (
-        db.query(TimeEntry)
-        .filter(
-            TimeEntry.user_id == current_user.id, TimeEntry.clock_out_time.is_(None)
-        )
-        .first()
-    )
 
-    if active_entry:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="You are already clocked in"
+    async def write(db: AsyncSession) -> TimeEntry:
+        # Check if user is already clocked in
+        active_entry = await db.scalar(
+            select(TimeEntry)
+            .where(
+                TimeEntry.user_id == current_user.id, TimeEntry.clock_out_time.is_(None)
+            )
+            .limit(1)
         )
 
-    # Validate location access
-    is_valid, error_message = LocationService.validate_location_access(
-        db, request.location_id, request.latitude, request.longitude
-    )
+        if active_entry:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="You are already clocked in"
+            )
 
-    if not is_valid:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=error_message
+        # Validate location access
+        is_valid, error_message = await LocationService.validate_location_access(
+            db, request.location_id, request.latitude, request.longitude
         )
 
-    # Create time entry
-    time_entry = TimeEntry(
-        user_id=current_user.id,
-        location_id=request.location_id,
-        clock_in_time=datetime.utcnow(),
-        clock_in_latitude=request.latitude,
-        clock_in_longitude=request.longitude,
-        clock_in_accuracy=request.accuracy,
-        notes=request.notes,
-    )
+        if not is_valid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=error_message
+            )
+
+        # Create time entry
+        time_entry = TimeEntry(
+            user_id=current_user.id,
+            location_id=request.location_id,
+            clock_in_time=datetime.utcnow(),
+            clock_in_latitude=request.latitude,
+            clock_in_longitude=request.longitude,
+            clock_in_accuracy=request.accuracy,
+            notes=request.notes,
+        )
+        db.add(time_entry)
+        return time_entry
 
-    db.add(time_entry)
-    db.commit()
-    db.refresh(time_entry)
+    time_entry = await commit_time_entry_write(db, write)
+    await presence_broker.publish(PresenceEventType.CLOCK_IN, [presence_entry(time_entry)])
 
     return time_entry
 
@@ -66,73 +109,100 @@ async def clock_in(
 @router.post("/clock-out", response_model=TimeEntryResponse)
 async def clock_out(
     request: ClockOutRequest,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Clock out from current shift"""
-    # Find active time entry
-    active_entry = (
-        db.query(TimeEntry)
-        .filter(
-            TimeEntry.user_id == current_user.id, TimeEntry.clock_out_time.is_(None)
-        )
-        .first()
-    )
 
-    if not active_entry:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You are not currently clocked in",
+    async def write(db: AsyncSession) -> TimeEntry:
+        # Find active time entry
+        active_entry = await db.scalar(
+            select(TimeEntry)
+            .where(
+                TimeEntry.user_id == current_user.id, TimeEntry.clock_out_time.is_(None)
+            )
+            .limit(1)
         )
 
-    # Update time entry
-    active_entry.clock_out_time = datetime.utcnow()
-    active_entry.clock_out_latitude = request.latitude
-    active_entry.clock_out_longitude = request.longitude
-    active_entry.clock_out_accuracy = request.accuracy
+        if not active_entry:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="You are not currently clocked in",
+            )
+
+        # Update time entry
+        active_entry.clock_out_time = datetime.utcnow()
+        active_entry.clock_out_latitude = request.latitude
+        active_entry.clock_out_longitude = request.longitude
+        active_entry.clock_out_accuracy = request.accuracy
+
+        if request.notes:
+            active_entry.notes = (
+                active_entry.notes or ""
+            ) + f"\nClock out notes: {request.notes}"
 
-    if request.notes:
-        active_entry.notes = (
-            active_entry.notes or ""
-        ) + f"\nClock out notes: {request.notes}"
+        await RollupService.record(db, [RollupService.interval(active_entry)])
+        return active_entry
 
-    db.commit()
-    db.refresh(active_entry)
+    active_entry = await commit_time_entry_write(db, write)
+    await presence_broker.publish(PresenceEventType.CLOCK_OUT, [presence_entry(active_entry)])
 
     return active_entry
 
 
+@router.post("/batch", response_model=BatchPunchResponse)
+async def sync_punches(
+    request: BatchPunchRequest,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Replay buffered clock-in/clock-out punches from kiosks and offline clients"""
+    results = await PunchSyncService.apply(
+        db, request.punches, current_user.id, current_user.role
+    )
+    accepted = sum(1 for result in results if result.accepted)
+    return {
+        "accepted": accepted,
+        "rejected": len(results) - accepted,
+        "results": results,
+    }
+
+
 @router.get("/my-entries", response_model=List[TimeEntryResponse])
 async def get_my_entries(
-    skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get current user's time entries"""
-    entries = (
-        db.query(TimeEntry)
-        .filter(TimeEntry.user_id == current_user.id)
-        .order_by(TimeEntry.clock_in_time.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    entries, _ = await fetch_page(
+        db,
+        select(TimeEntry).where(TimeEntry.user_id == current_user.id),
+        [TimeEntry.clock_in_time, TimeEntry.id],
+        response,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        descending=True,
     )
 
-    return entries
+    return json_list_response(TimeEntryResponse, entries, response)
 
 
 @router.get("/my-active", response_model=TimeEntryResponse)
 async def get_my_active_entry(
-    current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)
 ):
     """Get current user's active time entry"""
-    active_entry = (
-        db.query(TimeEntry)
-        .filter(
+    active_entry = await db.scalar(
+        select(TimeEntry)
+        .where(
             TimeEntry.user_id == current_user.id, TimeEntry.clock_out_time.is_(None)
         )
-        .first()
+        .limit(1)
     )
 
     if not active_entry:
@@ -145,35 +215,192 @@ async def get_my_active_entry(
 
 @router.get("/active-employees", response_model=List[TimeEntryResponse])
 async def get_active_employees(
-    current_user: User = Depends(require_manager), db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_manager), db: AsyncSession = Depends(get_db)
 ):
     """Get all currently active employees (manager only)"""
-    active_entries = (
-        db.query(TimeEntry).filter(TimeEntry.clock_out_time.is_(None)).all()
+    result = await db.execute(
+        select(*TIME_ENTRY_RESPONSE_COLUMNS).where(TimeEntry.clock_out_time.is_(None))
+    )
+
+    return json_rows_response(result.all())
+
+
+@router.get("/export")
+async def export_time_entries(
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    location_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    format: ExportFormat = ExportFormat.CSV,
+    current_user: Principal = Depends(require_manager),
+):
+    """Stream time entries for payroll as CSV or NDJSON (manager only)"""
+    if start is not None and end is not None and start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be after 'to'",
+        )
+
+    query = ExportService.build_query(start, end, location_id, user_id)
+    return StreamingResponse(
+        ExportService.stream(query, format),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="time-entries.{format.value}"'
+        },
     )
 
-    return active_entries
+
+@router.get("/summary", response_model=TimesheetSummary)
+async def get_timesheet_summary(
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    user_id: Optional[int] = None,
+    overtime_after_minutes: Optional[int] = Query(None, ge=0),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get total, per-day and per-location worked minutes for a period"""
+    if user_id is None:
+        user_id = current_user.id
+    elif user_id != current_user.id and current_user.role not in ["manager", "admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
+        )
+    if start is not None and end is not None and start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be after 'to'",
+        )
+
+    return await TimesheetService.summary(db, user_id, start, end, overtime_after_minutes)
+
+
+@router.get("/reports/hours", response_model=List[HoursReportRow])
+async def get_hours_report(
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    period: ReportPeriod = ReportPeriod.DAY,
+    user_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get worked minutes per user, location and day or week (manager only)"""
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be after 'to'",
+        )
+
+    return await RollupService.report(db, start, end, period, user_id, location_id)
+
+
+@router.websocket("/live")
+async def presence_feed(
+    websocket: WebSocket,
+    token: str,
+    location_id: Optional[int] = None,
+):
+    """Push who is clocked in: a snapshot, then clock-in/clock-out deltas (manager only)"""
+    async with AsyncSessionLocal() as db:
+        principal = await authenticate_token(token, db)
+    if (
+        principal is None
+        or not principal.is_active
+        or principal.role not in ["manager", "admin"]
+    ):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    # Subscribe before the snapshot so no delta is missed; replayed deltas are
+    # idempotent per entry_id
+    subscription = presence_broker.subscribe(location_id)
+
+    async def watch_disconnect():
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            subscription.close()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        async with AsyncSessionLocal() as db:
+            await websocket.send_json(await load_snapshot(db, location_id))
+        while True:
+            event = await subscription.next(settings.PRESENCE_HEARTBEAT_SECONDS)
+            if event is CLOSED:
+                break
+            if subscription.overflowed:
+                subscription.resynced()
+                async with AsyncSessionLocal() as db:
+                    event = await load_snapshot(db, location_id)
+            await websocket.send_json(
+                event or {"type": PresenceEventType.HEARTBEAT.value, "entries": []}
+            )
+    except (WebSocketDisconnect, RuntimeError, OSError):
+        # The client went away mid-send
+        pass
+    finally:
+        watcher.cancel()
+        presence_broker.unsubscribe(subscription)
 
 
 @router.put("/{entry_id}", response_model=TimeEntryResponse)
 async def update_time_entry(
     entry_id: int,
     update_data: TimeEntryUpdate,
-    current_user: User = Depends(require_manager),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update time entry (manager only)"""
-    time_entry = db.query(TimeEntry).filter(TimeEntry.id == entry_id).first()
+    time_entry = await db.get(TimeEntry, entry_id)
 
     if not time_entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Time entry not found"
         )
 
-    for field, value in update_data.dict(exclude_unset=True).items():
+    changes = update_data.dict(exclude_unset=True)
+    for field in ("location_id", "clock_in_time"):
+        if field in changes and changes[field] is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"{field} cannot be empty"
+            )
+    for field in ("clock_in_time", "clock_out_time"):
+        if changes.get(field) is not None:
+            changes[field] = to_utc_naive(changes[field])
+    if "location_id" in changes and not await db.get(Location, changes["location_id"]):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Location not found"
+        )
+
+    previous = RollupService.interval(time_entry)
+    was_present = presence_entry(time_entry) if time_entry.clock_out_time is None else None
+    for field, value in changes.items():
         setattr(time_entry, field, value)
 
-    db.commit()
-    db.refresh(time_entry)
+    if time_entry.clock_out_time is not None and to_utc_naive(
+        time_entry.clock_out_time
+    ) < to_utc_naive(time_entry.clock_in_time):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Clock-out precedes clock-in",
+        )
+
+    await RollupService.replace(db, previous, RollupService.interval(time_entry))
+    await db.commit()
+    await db.refresh(time_entry)
+
+    # A correction can close, reopen or move an entry; a move is sent to the
+    # live feed as a clock-out at the old location and a clock-in at the new one
+    is_present = presence_entry(time_entry) if time_entry.clock_out_time is None else None
+    if is_present != was_present:
+        if was_present is not None:
+            await presence_broker.publish(PresenceEventType.CLOCK_OUT, [was_present])
+        if is_present is not None:
+            await presence_broker.publish(PresenceEventType.CLOCK_IN, [is_present])
 
     return time_entry
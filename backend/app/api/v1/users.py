@@ -1,9 +1,16 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import response_cache
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.auth import get_current_active_user, require_manager, require_admin
-from app.core.security import get_password_hash
+from app.core.etag import cache_etag, conditional_response
+from app.core.pagination import MAX_PAGE_SIZE, fetch_page
+from app.core.serialization import json_list_response
+from app.core.auth import (Principal, get_current_active_user, principal_cache,
+                           require_admin, require_manager)
+from app.core.security import get_password_hash_async
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
 
@@ -11,31 +18,45 @@ router = APIRouter()
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_active_user)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get current user information"""
-    return current_user
+    etag = cache_etag(await response_cache.entry_key(
+        "users", response_cache.key(current_user.role, "me", current_user.id)
+    ))
+    if etag is not None:
+        not_modified = conditional_response(response, etag, if_none_match)
+        if not_modified is not None:
+            return not_modified
+    return await db.get(User, current_user.id)
 
 @router.get("/", response_model=List[UserResponse])
 async def get_users(
-    skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(require_manager),
-    db: Session = Depends(get_db)
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all users (manager only)"""
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    users, _ = await fetch_page(
+        db, select(User), [User.id], response, cursor=cursor, skip=skip, limit=limit
+    )
+    return json_list_response(UserResponse, users, response)
 
 @router.post("/", response_model=UserResponse)
 async def create_user(
     user_data: UserCreate,
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new user (admin only)"""
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -43,7 +64,7 @@ async def create_user(
         )
     
     # Check if username already exists
-    existing_username = db.query(User).filter(User.username == user_data.username).first()
+    existing_username = await db.scalar(select(User).where(User.username == user_data.username))
     if existing_username:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -51,7 +72,7 @@ async def create_user(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     user = User(
         email=user_data.email,
         username=user_data.username,
@@ -61,58 +82,73 @@ async def create_user(
     )
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    await response_cache.invalidate("users")
     
     return user
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
-    current_user: User = Depends(require_manager),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get user by ID (manager only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    cache_key = await response_cache.entry_key(
+        "users", response_cache.key(current_user.role, user_id)
+    )
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    await response_cache.set(
+        cache_key, UserResponse.model_validate(user), ttl=settings.CACHE_TTL_USERS
+    )
     return user
 
 @router.put("/{user_id}", response_model=UserResponse)
 async def update_user(
     user_id: int,
     user_data: UserUpdate,
-    current_user: User = Depends(require_manager),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update user (manager only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
+    previous_email = user.email
+    
     # Update fields
     for field, value in user_data.dict(exclude_unset=True).items():
         setattr(user, field, value)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    await principal_cache.invalidate_user(user.id, previous_email, user.email)
+    await response_cache.invalidate("users")
     
     return user
 
 @router.delete("/{user_id}")
 async def delete_user(
     user_id: int,
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete user (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -126,7 +162,10 @@ async def delete_user(
             detail="Cannot delete yourself"
         )
     
-    db.delete(user)
-    db.commit()
+    email = user.email
+    await db.delete(user)
+    await db.commit()
+    await principal_cache.invalidate_user(user_id, email)
+    await response_cache.invalidate("users")
     
     return {"message": "User deleted successfully"}
@@ -1,64 +1,126 @@
-from datetime import datetime
-from typing import List
+from datetime import date, datetime
+from typing import List, Optional
 
-from app.core.auth import get_current_active_user, require_manager
+from app.core.auth import Principal, get_current_active_user, require_manager
+from app.core.cache import response_cache
+from app.core.config import settings
 from app.core.database import get_db
-from app.models.user import User
+from app.core.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, fetch_page
+from app.core.serialization import json_list_response
 from app.models.vacation_request import VacationRequest, VacationStatus
-from app.schemas.vacation_request import (VacationRequestCreate,
+from app.schemas.vacation_request import (BulkDecisionOutcome,
+                                          BulkDecisionRequest,
+                                          BulkDecisionResponse,
+                                          BulkDecisionResult, CalendarDay,
+                                          VacationDecision,
+                                          VacationRequestCreate,
                                           VacationRequestResponse,
                                           VacationRequestUpdate)
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from app.services.vacation_calendar_service import (MAX_CALENDAR_DAYS,
+                                                    VacationCalendarService)
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
 
 @router.get("/my-requests", response_model=List[VacationRequestResponse])
 async def get_my_vacation_requests(
-    skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get current user's vacation requests"""
-    requests = (
-        db.query(VacationRequest)
-        .filter(VacationRequest.user_id == current_user.id)
-        .order_by(VacationRequest.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    requests, _ = await fetch_page(
+        db,
+        select(VacationRequest).where(VacationRequest.user_id == current_user.id),
+        [VacationRequest.created_at, VacationRequest.id],
+        response,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        descending=True,
     )
 
-    return requests
+    return json_list_response(VacationRequestResponse, requests, response)
 
 
 @router.get("/pending", response_model=List[VacationRequestResponse])
 async def get_pending_requests(
-    skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(require_manager),
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get all pending vacation requests (manager only)"""
-    requests = (
-        db.query(VacationRequest)
-        .filter(VacationRequest.status == VacationStatus.PENDING)
-        .order_by(VacationRequest.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    cache_key = await response_cache.entry_key(
+        "vacation_requests",
+        response_cache.key(current_user.role, "pending", skip, limit, cursor),
+    )
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        if cached["next_cursor"]:
+            response.headers[NEXT_CURSOR_HEADER] = cached["next_cursor"]
+        return cached["items"]
+
+    requests, next_cursor = await fetch_page(
+        db,
+        select(VacationRequest).where(VacationRequest.status == VacationStatus.PENDING),
+        [VacationRequest.created_at, VacationRequest.id],
+        response,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        descending=True,
+    )
+    await response_cache.set(
+        cache_key,
+        {
+            "items": [VacationRequestResponse.model_validate(request) for request in requests],
+            "next_cursor": next_cursor,
+        },
+        ttl=settings.CACHE_TTL_VACATION_REQUESTS,
     )
 
     return requests
 
 
+@router.get("/calendar", response_model=List[CalendarDay])
+async def get_vacation_calendar(
+    response: Response,
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    location_id: Optional[int] = None,
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get approved and pending absences per day (manager only)"""
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be after 'to'",
+        )
+    if (end - start).days >= MAX_CALENDAR_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The range must not exceed {MAX_CALENDAR_DAYS} days",
+        )
+
+    days = await VacationCalendarService.calendar(db, start, end, location_id)
+    return json_list_response(CalendarDay, days, response)
+
+
 @router.post("/", response_model=VacationRequestResponse)
 async def create_vacation_request(
     request_data: VacationRequestCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create new vacation request"""
     # Create vacation request
@@ -70,20 +132,105 @@ async def create_vacation_request(
     )
 
     db.add(vacation_request)
-    db.commit()
-    db.refresh(vacation_request)
+    await db.commit()
+    await db.refresh(vacation_request)
+    await response_cache.invalidate("vacation_requests")
 
     return vacation_request
 
 
+@router.post("/bulk-decision", response_model=BulkDecisionResponse)
+async def bulk_decide_vacation_requests(
+    request_data: BulkDecisionRequest,
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db),
+):
+    """Approve or reject many pending vacation requests at once (manager only)"""
+    if request_data.decision == VacationDecision.REJECT and not request_data.reason:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A reason is required to reject requests",
+        )
+    if request_data.decision == VacationDecision.APPROVE and request_data.reason:
+        # Approvals record who and when, like PUT /{request_id}/approve; there is no column for a reason
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A reason is only accepted when rejecting requests",
+        )
+
+    if request_data.decision == VacationDecision.APPROVE:
+        new_status = VacationStatus.APPROVED
+        values = {
+            "status": new_status,
+            "approved_by": current_user.id,
+            "approved_at": datetime.utcnow(),
+        }
+    else:
+        new_status = VacationStatus.REJECTED
+        values = {"status": new_status, "rejection_reason": request_data.reason}
+
+    ids = list(dict.fromkeys(request_data.ids))
+
+    # One conditional update: requests decided concurrently are left alone
+    updated = set(
+        (
+            await db.scalars(
+                update(VacationRequest)
+                .where(
+                    VacationRequest.id.in_(ids),
+                    VacationRequest.status == VacationStatus.PENDING,
+                )
+                .values(**values)
+                .returning(VacationRequest.id)
+                .execution_options(synchronize_session=False)
+            )
+        ).all()
+    )
+
+    # Tell missing requests from ones that were no longer pending
+    skipped = [request_id for request_id in ids if request_id not in updated]
+    current_status = {}
+    if skipped:
+        current_status = dict(
+            (
+                await db.execute(
+                    select(VacationRequest.id, VacationRequest.status).where(
+                        VacationRequest.id.in_(skipped)
+                    )
+                )
+            ).all()
+        )
+
+    await db.commit()
+    if updated:
+        await response_cache.invalidate("vacation_requests")
+
+    results = []
+    for request_id in ids:
+        if request_id in updated:
+            results.append(BulkDecisionResult(
+                id=request_id, outcome=BulkDecisionOutcome.UPDATED, status=new_status
+            ))
+        elif request_id in current_status:
+            results.append(BulkDecisionResult(
+                id=request_id,
+                outcome=BulkDecisionOutcome.NOT_PENDING,
+                status=current_status[request_id],
+            ))
+        else:
+            results.append(BulkDecisionResult(id=request_id, outcome=BulkDecisionOutcome.NOT_FOUND))
+
+    return {"decision": request_data.decision, "updated": len(updated), "results": results}
+
+
 @router.get("/{request_id}", response_model=VacationRequestResponse)
 async def get_vacation_request(
     request_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get vacation request by ID"""
-    request = db.query(VacationRequest).filter(VacationRequest.id == request_id).first()
+    request = await db.get(VacationRequest, request_id)
     if not request:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Vacation request not found"
@@ -104,11 +251,11 @@ async def get_vacation_request(
 @router.put("/{request_id}/approve")
 async def approve_vacation_request(
     request_id: int,
-    current_user: User = Depends(require_manager),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db),
 ):
     """Approve vacation request (manager only)"""
-    request = db.query(VacationRequest).filter(VacationRequest.id == request_id).first()
+    request = await db.get(VacationRequest, request_id)
     if not request:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Vacation request not found"
@@ -123,8 +270,9 @@ async def approve_vacation_request(
     request.approved_by = current_user.id
     request.approved_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(request)
+    await db.commit()
+    await db.refresh(request)
+    await response_cache.invalidate("vacation_requests")
 
     return {"message": "Vacation request approved"}
 
@@ -133,11 +281,11 @@ async def approve_vacation_request(
 async def reject_vacation_request(
     request_id: int,
     rejection_reason: str,
-    current_user: User = Depends(require_manager),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_manager),
+    db: AsyncSession = Depends(get_db),
 ):
     """Reject vacation request (manager only)"""
-    request = db.query(VacationRequest).filter(VacationRequest.id == request_id).first()
+    request = await db.get(VacationRequest, request_id)
     if not request:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Vacation request not found"
@@ -151,8 +299,9 @@ async def reject_vacation_request(
     request.status = VacationStatus.REJECTED
     request.rejection_reason = rejection_reason
 
-    db.commit()
-    db.refresh(request)
+    await db.commit()
+    await db.refresh(request)
+    await response_cache.invalidate("vacation_requests")
 
     return {"message": "Vacation request rejected"}
 
@@ -161,11 +310,11 @@ async def reject_vacation_request(
 async def update_vacation_request(
     request_id: int,
     request_data: VacationRequestUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update vacation request"""
-    request = db.query(VacationRequest).filter(VacationRequest.id == request_id).first()
+    request = await db.get(VacationRequest, request_id)
     if not request:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Vacation request not found"
@@ -187,8 +336,9 @@ async def update_vacation_request(
     for field, value in request_data.dict(exclude_unset=True).items():
         setattr(request, field, value)
 
-    db.commit()
-    db.refresh(request)
+    await db.commit()
+    await db.refresh(request)
+    await response_cache.invalidate("vacation_requests")
 
     return request
 
@@ -196,11 +346,11 @@ async def update_vacation_request(
 @router.delete("/{request_id}")
 async def cancel_vacation_request(
     request_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Cancel vacation request"""
-    request = db.query(VacationRequest).filter(VacationRequest.id == request_id).first()
+    request = await db.get(VacationRequest, request_id)
     if not request:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Vacation request not found"
@@ -219,6 +369,7 @@ async def cancel_vacation_request(
         )
 
     request.status = VacationStatus.CANCELLED
-    db.commit()
+    await db.commit()
+    await response_cache.invalidate("vacation_requests")
 
     return {"message": "Vacation request cancelled"}
@@ -1,17 +1,173 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import response_cache
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.security import verify_token
-from app.models.user import User
+from app.core.security import decode_access_token
+from app.models.user import User, UserRole
 from app.schemas.user import TokenData
 
+logger = logging.getLogger(__name__)
+
 security = HTTPBearer()
 
-def get_current_user(
+class Principal:
+    """Lightweight snapshot of an authenticated user"""
+    
+    __slots__ = ("id", "email", "role", "is_active", "expires_at", "version")
+    
+    def __init__(
+        self,
+        id: int,
+        email: str,
+        role: UserRole,
+        is_active: bool,
+        expires_at: float,
+        version: Optional[str] = None,
+    ):
+        self.id = id
+        self.email = email
+        self.role = role
+        self.is_active = is_active
+        self.expires_at = expires_at
+        self.version = version
+    
+    def __repr__(self):
+        return f"<Principal(id={self.id}, email='{self.email}', role='{self.role}')>"
+
+class PrincipalCache:
+    """
+    Bounded LRU cache of verified tokens mapped to principals.
+    Entries never outlive the token's exp claim. Every user has a version
+    number in the shared cache backend, keyed by the token subject, that
+    user updates and deletions bump; a hit whose version is no longer
+    current is dropped, so revocation reaches every worker on its next
+    request. If the backend cannot be reached, nothing is served from cache.
+    """
+    
+    def __init__(self, max_size: int, ttl_seconds: float, backend, prefix: str):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+        self.prefix = prefix
+        self._entries: "OrderedDict[str, Principal]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+    
+    def _version_key(self, subject: str) -> str:
+        return f"{self.prefix}:principal:{subject}:version"
+    
+    async def version(self, subject: str) -> Optional[str]:
+        """Current shared version of a user, or None if the backend failed"""
+        try:
+            return await self.backend.get(self._version_key(subject)) or "0"
+        except Exception as exc:
+            logger.warning("Principal version lookup failed for %s: %s", subject, exc)
+            return None
+    
+    async def get(self, token: str) -> Optional[Principal]:
+        with self._lock:
+            principal = self._entries.get(token)
+            if principal is None:
+                return None
+            if principal.expires_at <= time.time():
+                self._discard(token)
+                return None
+            self._entries.move_to_end(token)
+        
+        version = await self.version(principal.email)
+        if version is None or version != principal.version:
+            with self._lock:
+                if self._entries.get(token) is principal:
+                    self._discard(token)
+            return None
+        return principal
+    
+    def put(self, token: str, principal: Principal) -> None:
+        with self._lock:
+            self._discard(token)
+            self._entries[token] = principal
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                self._discard(next(iter(self._entries)))
+    
+    async def invalidate_user(self, user_id: int, *emails: str) -> None:
+        """
+        Drop every cached token of a user here and, by bumping the version of
+        each of the user's emails (old and new on an email change), in every
+        other worker
+        """
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._discard(token)
+        for email in set(emails):
+            try:
+                await self.backend.incr(self._version_key(email))
+            except Exception as exc:
+                logger.warning("Principal invalidation failed for %s: %s", email, exc)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+    
+    def _discard(self, token: str) -> None:
+        principal = self._entries.pop(token, None)
+        if principal is None:
+            return
+        tokens = self._tokens_by_user.get(principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[principal.id]
+
+principal_cache = PrincipalCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+    backend=response_cache.backend,
+    prefix=settings.CACHE_KEY_PREFIX,
+)
+
+async def authenticate_token(token: str, db: AsyncSession) -> Optional[Principal]:
+    """Resolve a bearer token to a principal, or None if it is invalid"""
+    principal = await principal_cache.get(token)
+    if principal is not None:
+        return principal
+    
+    payload = decode_access_token(token)
+    if payload is None or payload.get("sub") is None:
+        return None
+    
+    # Read before the user so a revocation committed meanwhile is not cached as current
+    version = await principal_cache.version(payload["sub"])
+    result = await db.execute(
+        select(User.id, User.email, User.role, User.is_active)
+        .where(User.email == payload["sub"])
+    )
+    user = result.first()
+    if user is None:
+        return None
+    
+    expires_at = time.time() + principal_cache.ttl_seconds
+    if payload.get("exp") is not None:
+        expires_at = min(expires_at, float(payload["exp"]))
+    
+    principal = Principal(user.id, user.email, user.role, user.is_active, expires_at, version)
+    if version is not None:
+        principal_cache.put(token, principal)
+    return principal
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
     """Get current authenticated user"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -19,24 +175,18 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    token = credentials.credentials
-    email = verify_token(token)
-    if email is None:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    principal = await authenticate_token(credentials.credentials, db)
+    if principal is None:
         raise credentials_exception
-    
-    return user
+    return principal
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def require_manager(current_user: User = Depends(get_current_active_user)) -> User:
+def require_manager(current_user: Principal = Depends(get_current_active_user)) -> Principal:
     """Require manager or admin role"""
     if current_user.role not in ["manager", "admin"]:
         raise HTTPException(
@@ -45,7 +195,7 @@ def require_manager(current_user: User = Depends(get_current_active_user)) -> Us
         )
     return current_user
 
-def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
+def require_admin(current_user: Principal = Depends(get_current_active_user)) -> Principal:
     """Require admin role"""
     if current_user.role != "admin":
         raise HTTPException(
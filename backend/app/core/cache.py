@@ -0,0 +1,153 @@
+import json
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryCache:
+    """Process-local cache backend with the same interface as RedisCache"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple[Optional[float], str]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        self._data[key] = (None, str(value))
+        return value
+
+    async def add(self, key: str, value: str) -> None:
+        """Store a value only if the key is absent"""
+        if await self.get(key) is None:
+            await self.set(key, value)
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+
+class RedisCache:
+    """Cache backend shared by all workers through Redis"""
+
+    def __init__(self, url: str):
+        from redis import asyncio as aioredis
+
+        self.client = aioredis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        await self.client.set(key, value, ex=ttl)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def add(self, key: str, value: str) -> None:
+        await self.client.set(key, value, nx=True)
+
+    async def clear(self) -> None:
+        await self.client.flushdb()
+
+
+class ResponseCache:
+    """
+    Read-through cache for GET responses.
+
+    Keys are namespaced per resource and per role of the caller. Every
+    namespace carries a version number that write handlers bump to invalidate
+    all of its entries at once, in every worker. A missing version starts at
+    a random value, so keys (and entity tags built from them) issued before
+    the cache was emptied never come back. Backend errors are logged and
+    treated as a miss so an unavailable cache never fails a request.
+    """
+
+    def __init__(self, backend, prefix: str):
+        self.backend = backend
+        self.prefix = prefix
+
+    @staticmethod
+    def key(role: Any, *parts: Any) -> str:
+        """Build an entry key from the caller's role and the request parameters"""
+        role = getattr(role, "value", role)
+        return ":".join(str(part) for part in (role, *parts))
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}:version"
+
+    async def entry_key(self, namespace: str, key: str) -> Optional[str]:
+        """
+        Resolve a key against the current version of its namespace. Look up
+        and store with the same resolved key: a value loaded before a write
+        bumped the version is then stored under the old version, where no
+        reader will find it. None if the backend cannot be reached.
+        """
+        version_key = self._version_key(namespace)
+        try:
+            version = await self.backend.get(version_key)
+            if version is None:
+                await self.backend.add(version_key, str(secrets.randbits(48)))
+                version = await self.backend.get(version_key)
+        except Exception as exc:
+            logger.warning("Cache version read failed for %s: %s", namespace, exc)
+            return None
+        return f"{self.prefix}:{namespace}:v{version}:{key}"
+
+    async def get(self, entry_key: Optional[str]) -> Optional[Any]:
+        if entry_key is None:
+            return None
+        try:
+            value = await self.backend.get(entry_key)
+        except Exception as exc:
+            logger.warning("Cache read failed for %s: %s", entry_key, exc)
+            return None
+        return json.loads(value) if value is not None else None
+
+    async def set(self, entry_key: Optional[str], value: Any, ttl: int) -> None:
+        if entry_key is None:
+            return
+        try:
+            await self.backend.set(entry_key, json.dumps(jsonable_encoder(value)), ttl)
+        except Exception as exc:
+            logger.warning("Cache write failed for %s: %s", entry_key, exc)
+
+    async def invalidate(self, *namespaces: str) -> None:
+        """Drop every cached entry of the given namespaces"""
+        for namespace in namespaces:
+            try:
+                await self.backend.incr(self._version_key(namespace))
+            except Exception as exc:
+                logger.warning("Cache invalidation failed for %s: %s", namespace, exc)
+
+
+def build_cache_backend():
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(settings.REDIS_URL)
+    return InMemoryCache()
+
+
+response_cache = ResponseCache(build_cache_backend(), prefix=settings.CACHE_KEY_PREFIX)
@@ -1,28 +1,403 @@
-from sqlalchemy import create_engine
+import hashlib
+import itertools
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession, async_sessionmaker,
+                                    create_async_engine)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from starlette.requests import HTTPConnection
+from app.core.cache import response_cache
 from app.core.config import settings
+from app.core.metrics import metrics
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,
-)
+logger = logging.getLogger(__name__)
+
+# Async drivers used by the API for each sync URL scheme
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_url(url: str) -> str:
+    """Map a sync database URL to the equivalent async driver"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+class QueryLog:
+    """Statements run during one request or query_budget() block, grouped by shape"""
+
+    __slots__ = ("label", "count", "seconds", "shapes")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes run at least threshold times: probable N+1 patterns"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def describe(self) -> str:
+        return "\n".join(f"{count:>5} x {shape}" for shape, count in self.shapes.most_common())
+
+
+# Query log of the request being served (set by QueryDiagnosticsMiddleware)
+current_query_log: ContextVar[Optional[QueryLog]] = ContextVar("current_query_log", default=None)
+
+# Process-wide logs of active query_budget() blocks; these see every thread,
+# which covers TestClient running the app on its own event loop
+_budget_logs: List[QueryLog] = []
+
+# Runs of bind placeholders, as produced by expanding IN lists
+PLACEHOLDER_RUN = re.compile(r"(\?|%s|\$\d+|:\w+)(\s*,\s*(\?|%s|\$\d+|:\w+))+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with whitespace and IN-list lengths normalized"""
+    return PLACEHOLDER_RUN.sub("?, ...", " ".join(statement.split()))
+
+
+def _observe_statement(statement: str, parameters, seconds: float) -> None:
+    if settings.METRICS_ENABLED:
+        metrics.observe_query(seconds)
+    for log in _budget_logs:
+        log.record(statement, seconds)
+    if not settings.QUERY_DIAGNOSTICS:
+        return
+    log = current_query_log.get()
+    if log is not None:
+        log.record(statement, seconds)
+    if seconds * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s; parameters: %.500r",
+            seconds * 1000,
+            log.label if log is not None else "background",
+            " ".join(statement.split()),
+            parameters,
+        )
+
+
+def instrument(engine: Engine) -> None:
+    """Time every statement for the metrics registry and any active query log"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        _observe_statement(statement, parameters, seconds)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        # Failed statements never reach after_cursor_execute
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+
+class QueryDiagnosticsMiddleware:
+    """
+    Development/staging aid enabled by QUERY_DIAGNOSTICS: records each
+    request's statements and logs shapes repeated N_PLUS_ONE_THRESHOLD times
+    or more, typically a lazy load per row
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog(f"{scope['method']} {scope['path']}")
+        token = current_query_log.set(log)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_query_log.reset(token)
+            for shape, count in log.repeated(settings.N_PLUS_ONE_THRESHOLD):
+                logger.warning(
+                    "Probable N+1 in %s: %d x %s (%d queries in total)",
+                    log.label, count, shape, log.count,
+                )
+
+
+@contextmanager
+def query_budget(max_queries: int, max_repeats: Optional[int] = None, label: str = "block"):
+    """
+    Fail when the enclosed code runs more than max_queries statements, or
+    one statement shape more than max_repeats times. For tests:
+
+        with query_budget(3):
+            client.get("/api/v1/dashboard/active-employees", headers=headers)
+    """
+    log = QueryLog(label)
+    _budget_logs.append(log)
+    try:
+        yield log
+    finally:
+        _budget_logs.remove(log)
+
+    if log.count > max_queries:
+        raise AssertionError(
+            f"{label} ran {log.count} queries, over the budget of {max_queries}:\n{log.describe()}"
+        )
+    if max_repeats is not None and log.repeated(max_repeats + 1):
+        raise AssertionError(
+            f"{label} repeated a statement more than {max_repeats} times:\n{log.describe()}"
+        )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create base class for models
 Base = declarative_base()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Engines are created on first use (or by the app lifespan), never at import,
+# so importing models or the app does not touch the database. The schema is
+# managed by Alembic (`alembic upgrade head`) and init_db.py.
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+_replicas: Optional["ReplicaSet"] = None
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def pool_options(url: str) -> dict:
+    """Pool sizing for server databases; SQLite keeps its dialect's default pool"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+    }
+
+
+def create_api_engine(url: str) -> AsyncEngine:
+    engine = create_async_engine(
+        get_async_url(url),
+        pool_pre_ping=True,
+        pool_recycle=300,
+        **pool_options(url),
+    )
+    instrument(engine.sync_engine)
+    return engine
+
+
+class ReplicaSet:
+    """
+    Read replicas, handed out per session in round-robin order or to the
+    replica with the fewest open sessions of this worker
+    """
+
+    STRATEGIES = ("round_robin", "least_connections")
+
+    def __init__(self, engines: List[AsyncEngine], strategy: str):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown DATABASE_REPLICA_STRATEGY {strategy!r}")
+        self.engines = engines
+        self.strategy = strategy
+        self.open_sessions = [0] * len(engines)
+        self._next = itertools.cycle(range(len(engines)))
+
+    def acquire(self) -> int:
+        if self.strategy == "least_connections":
+            index = min(range(len(self.engines)), key=self.open_sessions.__getitem__)
+        else:
+            index = next(self._next)
+        self.open_sessions[index] += 1
+        return index
+
+    def release(self, index: int) -> None:
+        self.open_sessions[index] -= 1
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+
+class RoutingSession(Session):
+    """
+    Sends statements of a read-only session to its replica and everything
+    else to the primary. A session that writes (flush or DML) stays on the
+    primary from then on and is remembered for read-your-writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if isinstance(clause, UpdateBase):
+            self.info["wrote"] = True
+        replica = self.info.get("replica")
+        if replica is not None and not self.info.get("wrote"):
+            return _replicas.engines[replica].sync_engine
+        return _async_engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _mark_flush_as_write(session, flush_context, instances):
+    """Flushes bind per mapper, not per statement, so mark them before they bind"""
+    session.info["wrote"] = True
+
+
+class RoutingAsyncSession(AsyncSession):
+    async def commit(self) -> None:
+        await super().commit()
+        if self.info.pop("wrote", False) and _replicas is not None:
+            # A group-commit session commits on behalf of several clients
+            for key in self.info.pop("client_keys", [self.info.get("client_key")]):
+                await read_your_writes.mark(key)
+
+    async def close(self) -> None:
+        replica = self.info.pop("replica", None)
+        if replica is not None and _replicas is not None:
+            _replicas.release(replica)
+        await super().close()
+
+
+class ReadYourWrites:
+    """
+    Keeps a client's reads on the primary for READ_YOUR_WRITES_SECONDS after
+    it committed a write, so it sees its own clock-in despite replica lag.
+    Clients are identified by their bearer token. Marks live in the shared
+    cache backend, so they hold across workers; if the cache fails, reads go
+    to the primary.
+    """
+
+    def __init__(self, backend, prefix: str, seconds: int):
+        self.backend = backend
+        self.prefix = prefix
+        self.seconds = seconds
+
+    def client_key(self, authorization: Optional[str]) -> Optional[str]:
+        if not authorization:
+            return None
+        digest = hashlib.sha256(authorization.encode()).hexdigest()[:32]
+        return f"{self.prefix}:ryw:{digest}"
+
+    async def mark(self, key: Optional[str]) -> None:
+        if key is None or self.seconds <= 0:
+            return
+        try:
+            await self.backend.set(key, "1", self.seconds)
+        except Exception as exc:
+            logger.warning("Read-your-writes mark failed: %s", exc)
+
+    async def recently_wrote(self, key: Optional[str]) -> bool:
+        if key is None or self.seconds <= 0:
+            return False
+        try:
+            return await self.backend.get(key) is not None
+        except Exception as exc:
+            logger.warning("Read-your-writes lookup failed: %s", exc)
+            return True
+
+
+read_your_writes = ReadYourWrites(
+    response_cache.backend,
+    prefix=settings.CACHE_KEY_PREFIX,
+    seconds=settings.READ_YOUR_WRITES_SECONDS,
+)
+
+
+def get_engine() -> Engine:
+    """Sync engine used by scripts and schema management"""
+    global _engine, _session_factory
+    if _engine is None:
+        _engine = create_engine(
+            settings.DATABASE_URL,
+            pool_pre_ping=True,
+            pool_recycle=300,
+            **pool_options(settings.DATABASE_URL),
+        )
+        instrument(_engine)
+        _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+    return _engine
+
+
+def SessionLocal() -> Session:
+    """New sync session"""
+    get_engine()
+    return _session_factory()
+
+
+def init_async_engine() -> AsyncEngine:
+    """Create the primary and replica engines and the session factory used by the API"""
+    global _async_engine, _async_session_factory, _replicas
+    if _async_engine is None:
+        _async_engine = create_api_engine(settings.DATABASE_URL)
+        if settings.replica_urls_list:
+            _replicas = ReplicaSet(
+                [create_api_engine(url) for url in settings.replica_urls_list],
+                settings.DATABASE_REPLICA_STRATEGY,
+            )
+        _async_session_factory = async_sessionmaker(
+            class_=RoutingAsyncSession,
+            sync_session_class=RoutingSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_engine
+
+
+def AsyncSessionLocal(read_only: bool = False) -> AsyncSession:
+    """New async session; a read-only one reads from a replica when any are configured"""
+    init_async_engine()
+    session = _async_session_factory()
+    if read_only and _replicas is not None:
+        session.info["replica"] = _replicas.acquire()
+    return session
+
+
+async def dispose_engines() -> None:
+    """Close pooled connections; the engines are recreated on next use"""
+    global _engine, _session_factory, _async_engine, _async_session_factory, _replicas
+    if _replicas is not None:
+        await _replicas.dispose()
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+    _engine = _session_factory = _async_engine = _async_session_factory = _replicas = None
+
 
 # Dependency to get database session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db(connection: HTTPConnection):
+    """
+    Session for one request: reads (GET/HEAD) go to a replica unless the
+    caller wrote within READ_YOUR_WRITES_SECONDS; everything else uses the primary
+    """
+    init_async_engine()
+    client_key = read_your_writes.client_key(connection.headers.get("authorization"))
+    read_only = (
+        _replicas is not None
+        and connection.scope.get("method") in READ_METHODS
+        and not await read_your_writes.recently_wrote(client_key)
+    )
+
+    async with AsyncSessionLocal(read_only=read_only) as db:
+        db.info["client_key"] = client_key
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,55 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+ETAG_HEADER = "ETag"
+
+# Clients may keep the body but must revalidate it before every use
+REVALIDATE = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong entity tag over the given validator values"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(repr(part).encode())
+        digest.update(b"\x00")
+    return f'"{digest.hexdigest()}"'
+
+
+def cache_etag(cache_key: Optional[str]) -> Optional[str]:
+    """
+    Entity tag of a response cache key from ResponseCache.entry_key. The key
+    carries the namespace version, which every write to the namespace bumps,
+    along with the caller's role and the request parameters, so the tag
+    changes whenever the representation can and a 304 needs no database
+    access. None when the cache backend is unavailable.
+    """
+    return make_etag(cache_key) if cache_key is not None else None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match evaluation (weak comparison, as RFC 9110 prescribes)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def conditional_response(
+    response: Response, etag: str, if_none_match: Optional[str]
+) -> Optional[Response]:
+    """
+    Tag the outgoing response, or return the 304 to send instead when the
+    client already holds the current representation
+    """
+    headers = {ETAG_HEADER: etag, "Cache-Control": REVALIDATE}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
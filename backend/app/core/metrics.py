@@ -0,0 +1,180 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+# Route label of requests that matched no route, to keep label cardinality bounded
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # The last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str, labels: str) -> Iterable[str]:
+        prefix = f"{labels}," if labels else ""
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{prefix}le="{bound:g}"}} {cumulative}'
+        yield f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}'
+        suffix = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{suffix} {self.sum:.6f}"
+        yield f"{name}_count{suffix} {self.count}"
+
+
+class RequestStats:
+    """Database work done while serving one request"""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Stats of the request being served; None outside requests (scripts, background tasks)
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request_stats", default=None
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**values: str) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in values.items())
+
+
+class MetricsRegistry:
+    """
+    Request and query metrics of this process. Each worker keeps its own
+    registry; Prometheus sums them when scraping every worker.
+    """
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.request_queries: Dict[Tuple[str, str], Histogram] = {}
+        self.request_db_time: Dict[Tuple[str, str], Histogram] = {}
+        self.query_duration = Histogram(LATENCY_BUCKETS)
+
+    def observe_query(self, seconds: float) -> None:
+        self.query_duration.observe(seconds)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += seconds
+
+    def observe_request(
+        self, method: str, route: str, status_code: int, seconds: float, stats: RequestStats
+    ) -> None:
+        key = (method, route)
+        self.requests[(method, route, status_code)] = (
+            self.requests.get((method, route, status_code), 0) + 1
+        )
+        if key not in self.latency:
+            self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.request_queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+            self.request_db_time[key] = Histogram(LATENCY_BUCKETS)
+        self.latency[key].observe(seconds)
+        self.request_queries[key].observe(stats.queries)
+        self.request_db_time[key].observe(stats.db_seconds)
+
+    def render(self) -> str:
+        lines: List[str] = [
+            "# HELP http_requests_total Requests served, by route template and status",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status_code), count in sorted(self.requests.items()):
+            labels = _labels(method=method, route=route, status=str(status_code))
+            lines.append(f"http_requests_total{{{labels}}} {count}")
+
+        for name, help_text, histograms in (
+            ("http_request_duration_seconds", "Request latency", self.latency),
+            ("http_request_db_queries", "Database queries per request", self.request_queries),
+            ("http_request_db_seconds", "Database time per request", self.request_db_time),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (method, route), histogram in sorted(histograms.items()):
+                lines.extend(histogram.samples(name, _labels(method=method, route=route)))
+
+        lines += [
+            "# HELP db_query_duration_seconds Duration of every database query",
+            "# TYPE db_query_duration_seconds histogram",
+        ]
+        lines.extend(self.query_duration.samples("db_query_duration_seconds", ""))
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request by route template (e.g.
+    /api/v1/locations/{location_id}) together with the queries it ran
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Dict[object, str] = {}
+
+    def route_template(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        if endpoint not in self._routes:
+            for route in scope["app"].routes:
+                if getattr(route, "endpoint", None) is endpoint:
+                    self._routes[endpoint] = route.path
+                    break
+            else:
+                self._routes[endpoint] = UNMATCHED_ROUTE
+        return self._routes[endpoint]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request_stats.reset(token)
+            metrics.observe_request(
+                scope["method"], self.route_template(scope), status_code, elapsed, stats
+            )
+
+
+# Process-wide registry fed by the middleware and the database engine hooks
+metrics = MetricsRegistry()
+
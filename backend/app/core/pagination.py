@@ -0,0 +1,129 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import DateTime, and_, func, literal, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Largest page a list endpoint serves
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort-key values of the last row into an opaque cursor"""
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError("cursor has the wrong number of keys")
+        return [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        ]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def _sort_key(column, dialect_name: str):
+    """
+    SQLite stores server-default timestamps without fractional seconds but
+    binds Python datetimes with them, so compare datetimes through julianday()
+    there to keep the stored text formats from breaking ties
+    """
+    if dialect_name == "sqlite" and isinstance(column.type, DateTime):
+        return func.julianday(column)
+    return column
+
+
+def keyset_paginate(
+    query: Select,
+    columns: Sequence,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False,
+    dialect_name: str = "",
+) -> Select:
+    """
+    Order by the given columns (the last one must be unique, e.g. id) and
+    return the rows that come after the cursor. One extra row is fetched so
+    the caller can tell whether another page exists.
+    """
+    keys = [_sort_key(column, dialect_name) for column in columns]
+
+    if cursor is not None:
+        values = decode_cursor(cursor, len(columns))
+        values = [
+            _sort_key(literal(value, column.type), dialect_name)
+            for column, value in zip(columns, values)
+        ]
+        # Expanded form of (a, b) < (x, y), which every backend can use with an index
+        clauses = []
+        for position, key in enumerate(keys):
+            compare = key < values[position] if descending else key > values[position]
+            equal_prefix = [keys[i] == values[i] for i in range(position)]
+            clauses.append(and_(*equal_prefix, compare))
+        query = query.where(or_(*clauses))
+
+    ordering = [key.desc() if descending else key.asc() for key in keys]
+    return query.order_by(*ordering).limit(limit + 1)
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query: Select,
+    columns: Sequence,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    descending: bool = False,
+) -> Tuple[List, Optional[str]]:
+    """
+    Fetch one page of ORM rows with keyset pagination and publish the next
+    page's cursor in the X-Next-Cursor header. A non-zero skip without a
+    cursor falls back to legacy offset pagination; the two cannot be combined.
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE or skip < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"limit must be between 1 and {MAX_PAGE_SIZE} and skip must not be negative",
+        )
+    if cursor is not None and skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cursor and skip cannot be combined",
+        )
+
+    if cursor is None and skip:
+        ordering = [column.desc() if descending else column.asc() for column in columns]
+        result = await db.scalars(query.order_by(*ordering).offset(skip).limit(limit))
+        return result.all(), None
+
+    dialect_name = db.get_bind().dialect.name
+    result = await db.scalars(
+        keyset_paginate(query, columns, cursor, limit, descending, dialect_name)
+    )
+    rows = result.all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in columns])
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows, next_cursor
@@ -0,0 +1,66 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Sequence, Type
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.config import settings
+
+# Headers of the injected Response that are carried over to a fast response
+SKIPPED_HEADERS = {"content-length", "content-type"}
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """Compiled validator/serializer for a list of model instances, built once per model"""
+    return TypeAdapter(List[model])
+
+
+def dump_list(model: Type[BaseModel], items: Iterable[Any]) -> bytes:
+    """
+    Validate ORM objects against the response model and encode them to JSON
+    in one pass through pydantic-core, skipping FastAPI's generic
+    validate -> dict -> json.dumps pipeline
+    """
+    adapter = list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(list(items), from_attributes=True))
+
+
+def rows_to_dicts(rows: Sequence[Any]) -> List[dict]:
+    """Plain dicts from SQLAlchemy Row tuples selected with labelled columns"""
+    return [row._asdict() for row in rows]
+
+
+def _carry_headers(source: Optional[Response], target: Response) -> Response:
+    if source is not None:
+        for name, value in source.headers.items():
+            if name not in SKIPPED_HEADERS:
+                target.headers[name] = value
+    return target
+
+
+def json_list_response(
+    model: Type[BaseModel], items: Iterable[Any], response: Optional[Response] = None
+):
+    """
+    Fast path for large list endpoints that return ORM objects. Returns the
+    items unchanged (FastAPI serializes them as usual) when
+    FAST_JSON_RESPONSES is off. Headers set on the injected response, such
+    as the next-page cursor, are kept.
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return items
+    fast = Response(content=dump_list(model, items), media_type="application/json")
+    return _carry_headers(response, fast)
+
+
+def json_rows_response(rows: Sequence[Any], response: Optional[Response] = None):
+    """
+    Fast path for endpoints that select plain columns: Row tuples are
+    encoded with orjson without building any model instances
+    """
+    content = rows_to_dicts(rows)
+    if not settings.FAST_JSON_RESPONSES:
+        return content
+    return _carry_headers(response, ORJSONResponse(content))
@@ -0,0 +1,8 @@
+from datetime import datetime, timezone
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Normalize to the naive UTC datetimes stored by clock_in/clock_out"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
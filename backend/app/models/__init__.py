@@ -2,6 +2,7 @@ from .user import User
 from .location import Location
 from .time_entry import TimeEntry
 from .vacation_request import VacationRequest
+from .daily_hours import DailyHours
 from app.core.database import Base
 
-__all__ = ["Base", "User", "Location", "TimeEntry", "VacationRequest"]
+__all__ = ["Base", "User", "Location", "TimeEntry", "VacationRequest", "DailyHours"]
@@ -0,0 +1,29 @@
+from app.core.database import Base
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer
+from sqlalchemy.sql import func
+
+
+class DailyHours(Base):
+    """
+    Worked time per user, location and UTC day, maintained incrementally
+    from closed time entries. Entries that cross midnight contribute to
+    each day they cover.
+    """
+
+    __tablename__ = "daily_hours"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    worked_seconds = Column(Integer, nullable=False, default=0)
+    entry_count = Column(Integer, nullable=False, default=0)  # Entries touching this day
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Site reports over a date range
+        Index("ix_daily_hours_location_day", location_id, day),
+    )
+
+    def __repr__(self):
+        return f"<DailyHours(user_id={self.user_id}, location_id={self.location_id}, day={self.day}, seconds={self.worked_seconds})>"
@@ -1,9 +1,12 @@
 import enum
 
 from app.core.database import Base
-from sqlalchemy import Column, DateTime, Enum, Float, ForeignKey, Integer, Text
+from sqlalchemy import Column, DateTime, Enum, Float, ForeignKey, Index, Integer, Text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.sql.expression import FunctionElement
 
 
 class TimeEntryType(str, enum.Enum):
@@ -11,6 +14,31 @@ class TimeEntryType(str, enum.Enum):
     CLOCK_OUT = "clock_out"
 
 
+class minutes_between(FunctionElement):
+    """Whole minutes from the first timestamp to the second; NULL if either is NULL"""
+
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(minutes_between)
+def _minutes_between_default(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return "CAST(EXTRACT(EPOCH FROM (%s - %s)) AS INTEGER) / 60" % (
+        compiler.process(end, **kw),
+        compiler.process(start, **kw),
+    )
+
+
+@compiles(minutes_between, "sqlite")
+def _minutes_between_sqlite(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return "CAST(ROUND((julianday(%s) - julianday(%s)) * 86400) AS INTEGER) / 60" % (
+        compiler.process(end, **kw),
+        compiler.process(start, **kw),
+    )
+
+
 class TimeEntry(Base):
     __tablename__ = "time_entries"
 
@@ -40,6 +68,38 @@ class TimeEntry(Base):
     user = relationship("User", back_populates="time_entries")
     location = relationship("Location", back_populates="time_entries")
 
+    __table_args__ = (
+        # Open entry of a user (clock-in, clock-out, my-active)
+        Index(
+            "ix_time_entries_user_open",
+            user_id,
+            postgresql_where=clock_out_time.is_(None),
+            sqlite_where=clock_out_time.is_(None),
+        ),
+        # A user's history, newest first (my-entries)
+        Index("ix_time_entries_user_clock_in", user_id, clock_in_time, id),
+        # Everyone currently clocked in (active-employees, location delete check)
+        Index(
+            "ix_time_entries_open",
+            location_id,
+            clock_in_time,
+            postgresql_where=clock_out_time.is_(None),
+            sqlite_where=clock_out_time.is_(None),
+        ),
+    )
+
+    @hybrid_property
+    def duration_minutes(self):
+        """Worked minutes of a closed entry, None while clocked in"""
+        if self.clock_in_time is None or self.clock_out_time is None:
+            return None
+        return int(round((self.clock_out_time - self.clock_in_time).total_seconds())) // 60
+
+    @duration_minutes.inplace.expression
+    @classmethod
+    def _duration_minutes_expression(cls):
+        return minutes_between(cls.clock_in_time, cls.clock_out_time)
+
     @property
     def is_active(self):
         """Check if the time entry is currently active (clocked in but not out)"""
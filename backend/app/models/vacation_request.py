@@ -1,7 +1,7 @@
 import enum
 
 from app.core.database import Base
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, Text
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, Text, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -48,5 +48,20 @@ class VacationRequest(Base):
     )
     approver = relationship("User", foreign_keys=[approved_by])
 
+    __table_args__ = (
+        # Pending queue, newest first (pending); enums are stored by name
+        Index(
+            "ix_vacation_requests_pending_created",
+            created_at,
+            id,
+            postgresql_where=text("status = 'PENDING'"),
+            sqlite_where=text("status = 'PENDING'"),
+        ),
+        # A user's requests, newest first (my-requests)
+        Index("ix_vacation_requests_user_created", user_id, created_at, id),
+        # Date-range scans of the coverage calendar
+        Index("ix_vacation_requests_date", date, status),
+    )
+
     def __repr__(self):
         return f"<VacationRequest(id={self.id}, user_id={self.user_id}, status='{self.status}')>"
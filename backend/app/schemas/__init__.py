@@ -1,11 +1,18 @@
 from .user import UserCreate, UserUpdate, UserResponse, UserLogin
-from .location import LocationCreate, LocationUpdate, LocationResponse
-from .time_entry import TimeEntryCreate, TimeEntryUpdate, TimeEntryResponse, ClockInRequest, ClockOutRequest
-from .vacation_request import VacationRequestCreate, VacationRequestUpdate, VacationRequestResponse
+from .location import LocationCreate, LocationUpdate, LocationResponse, NearbyLocationResponse
+from .time_entry import TimeEntryCreate, TimeEntryUpdate, TimeEntryResponse, ClockInRequest, ClockOutRequest, PunchEvent, BatchPunchRequest, PunchResult, BatchPunchResponse, ExportFormat, ReportPeriod, HoursReportRow, DaySummary, LocationSummary, TimesheetSummary, PresenceEventType, PresenceEntry, PresenceEvent
+from .vacation_request import VacationRequestCreate, VacationRequestUpdate, VacationRequestResponse, VacationDecision, BulkDecisionRequest, BulkDecisionOutcome, BulkDecisionResult, BulkDecisionResponse, CalendarAbsence, CalendarDay
+from .dashboard import DashboardUser, DashboardLocation, ActiveEntryDetail, PendingVacationDetail
 
 __all__ = [
     "UserCreate", "UserUpdate", "UserResponse", "UserLogin",
-    "LocationCreate", "LocationUpdate", "LocationResponse",
+    "LocationCreate", "LocationUpdate", "LocationResponse", "NearbyLocationResponse",
     "TimeEntryCreate", "TimeEntryUpdate", "TimeEntryResponse", "ClockInRequest", "ClockOutRequest",
-    "VacationRequestCreate", "VacationRequestUpdate", "VacationRequestResponse"
+    "PunchEvent", "BatchPunchRequest", "PunchResult", "BatchPunchResponse", "ExportFormat",
+    "ReportPeriod", "HoursReportRow", "DaySummary", "LocationSummary", "TimesheetSummary",
+    "PresenceEventType", "PresenceEntry", "PresenceEvent",
+    "VacationRequestCreate", "VacationRequestUpdate", "VacationRequestResponse",
+    "VacationDecision", "BulkDecisionRequest", "BulkDecisionOutcome", "BulkDecisionResult",
+    "BulkDecisionResponse", "CalendarAbsence", "CalendarDay",
+    "DashboardUser", "DashboardLocation", "ActiveEntryDetail", "PendingVacationDetail"
 ]
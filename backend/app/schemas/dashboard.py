@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from app.models.user import UserRole
+from app.schemas.time_entry import TimeEntryResponse
+from app.schemas.vacation_request import VacationRequestResponse
+
+class DashboardUser(BaseModel):
+    id: int
+    full_name: str
+    email: str
+    role: UserRole
+
+    class Config:
+        from_attributes = True
+
+class DashboardLocation(BaseModel):
+    id: int
+    name: str
+    latitude: float
+    longitude: float
+    radius_meters: int
+
+    class Config:
+        from_attributes = True
+
+class ActiveEntryDetail(TimeEntryResponse):
+    user: DashboardUser
+    location: DashboardLocation
+
+class PendingVacationDetail(VacationRequestResponse):
+    user: DashboardUser
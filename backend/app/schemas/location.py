@@ -30,3 +30,6 @@ class LocationResponse(LocationBase):
     
     class Config:
         from_attributes = True
+
+class NearbyLocationResponse(LocationResponse):
+    distance_meters: float
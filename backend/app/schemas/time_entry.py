@@ -1,6 +1,10 @@
+import enum
 from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
+from app.models.time_entry import TimeEntryType
+
+MAX_BATCH_PUNCHES = 5000
 
 
 class TimeEntryBase(BaseModel):
@@ -13,6 +17,9 @@ class TimeEntryCreate(TimeEntryBase):
 
 
 class TimeEntryUpdate(BaseModel):
+    location_id: Optional[int] = None
+    clock_in_time: Optional[datetime] = None
+    clock_out_time: Optional[datetime] = None
     notes: Optional[str] = None
 
 
@@ -31,6 +38,93 @@ class ClockOutRequest(BaseModel):
     notes: Optional[str] = None
 
 
+class PunchEvent(BaseModel):
+    user_id: Optional[int] = None  # Defaults to the caller
+    type: TimeEntryType
+    timestamp: datetime
+    location_id: Optional[int] = None  # Required for clock-in
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    accuracy: Optional[float] = None
+    notes: Optional[str] = None
+
+
+class BatchPunchRequest(BaseModel):
+    punches: List[PunchEvent] = Field(..., min_length=1, max_length=MAX_BATCH_PUNCHES)
+
+
+class PunchResult(BaseModel):
+    index: int
+    accepted: bool
+    entry_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BatchPunchResponse(BaseModel):
+    accepted: int
+    rejected: int
+    results: List[PunchResult]
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ReportPeriod(str, enum.Enum):
+    DAY = "day"
+    WEEK = "week"  # Weeks start on Monday
+
+
+class HoursReportRow(BaseModel):
+    user_id: int
+    location_id: int
+    period_start: date
+    worked_minutes: int
+    entry_count: int
+
+
+class DaySummary(BaseModel):
+    day: date
+    minutes: int
+
+
+class LocationSummary(BaseModel):
+    location_id: int
+    location_name: str
+    minutes: int
+
+
+class TimesheetSummary(BaseModel):
+    user_id: int
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    entry_count: int
+    total_minutes: int
+    overtime_minutes: Optional[int] = None  # Set when a daily threshold is given
+    days: List[DaySummary]
+    locations: List[LocationSummary]
+
+
+class PresenceEventType(str, enum.Enum):
+    SNAPSHOT = "snapshot"
+    CLOCK_IN = "clock_in"
+    CLOCK_OUT = "clock_out"
+    HEARTBEAT = "heartbeat"
+
+
+class PresenceEntry(BaseModel):
+    entry_id: int
+    user_id: int
+    location_id: int
+    clock_in_time: datetime
+
+
+class PresenceEvent(BaseModel):
+    type: PresenceEventType
+    entries: List[PresenceEntry] = []
+
+
 class TimeEntryResponse(TimeEntryBase):
     id: int
     user_id: int
@@ -1,8 +1,11 @@
-from pydantic import BaseModel
-from typing import Optional
+import enum
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime, date
 from app.models.vacation_request import VacationStatus, VacationType
 
+MAX_BULK_DECISION_IDS = 1000
+
 class VacationRequestBase(BaseModel):
     date: date
     vacation_type: VacationType = VacationType.PERSONAL_DAY
@@ -32,3 +35,40 @@ class VacationRequestResponse(VacationRequestBase):
     
     class Config:
         from_attributes = True
+
+class VacationDecision(str, enum.Enum):
+    APPROVE = "approve"
+    REJECT = "reject"
+
+class BulkDecisionRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_DECISION_IDS)
+    decision: VacationDecision
+    reason: Optional[str] = None  # Stored as the rejection reason; required to reject, refused to approve
+
+class BulkDecisionOutcome(str, enum.Enum):
+    UPDATED = "updated"
+    NOT_FOUND = "not_found"
+    NOT_PENDING = "not_pending"
+
+class BulkDecisionResult(BaseModel):
+    id: int
+    outcome: BulkDecisionOutcome
+    status: Optional[VacationStatus] = None  # Status after the call; None when not found
+
+class BulkDecisionResponse(BaseModel):
+    decision: VacationDecision
+    updated: int
+    results: List[BulkDecisionResult]
+
+class CalendarAbsence(BaseModel):
+    request_id: int
+    user_id: int
+    full_name: str
+    status: VacationStatus
+    vacation_type: VacationType
+
+class CalendarDay(BaseModel):
+    date: date
+    approved: int
+    pending: int
+    absences: List[CalendarAbsence]
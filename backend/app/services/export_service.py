@@ -0,0 +1,127 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.location import Location
+from app.models.time_entry import TimeEntry
+from app.models.user import User
+from app.schemas.time_entry import ExportFormat
+
+# Column order of every exported row
+EXPORT_COLUMNS = [
+    "id",
+    "user_id",
+    "user_email",
+    "user_full_name",
+    "location_id",
+    "location_name",
+    "clock_in_time",
+    "clock_out_time",
+    "duration_minutes",
+    "clock_in_latitude",
+    "clock_in_longitude",
+    "clock_out_latitude",
+    "clock_out_longitude",
+    "notes",
+]
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+class ExportService:
+    @staticmethod
+    def build_query(
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        location_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+    ) -> Select:
+        """Flat rows for the export, oldest clock-in first"""
+        query = (
+            select(
+                TimeEntry.id,
+                TimeEntry.user_id,
+                User.email,
+                User.full_name,
+                TimeEntry.location_id,
+                Location.name,
+                TimeEntry.clock_in_time,
+                TimeEntry.clock_out_time,
+                TimeEntry.duration_minutes,
+                TimeEntry.clock_in_latitude,
+                TimeEntry.clock_in_longitude,
+                TimeEntry.clock_out_latitude,
+                TimeEntry.clock_out_longitude,
+                TimeEntry.notes,
+            )
+            .join(User, User.id == TimeEntry.user_id)
+            .join(Location, Location.id == TimeEntry.location_id)
+        )
+        if start is not None:
+            query = query.where(TimeEntry.clock_in_time >= start)
+        if end is not None:
+            query = query.where(TimeEntry.clock_in_time < end)
+        if location_id is not None:
+            query = query.where(TimeEntry.location_id == location_id)
+        if user_id is not None:
+            query = query.where(TimeEntry.user_id == user_id)
+        return query.order_by(TimeEntry.clock_in_time, TimeEntry.id)
+
+    @staticmethod
+    def _record(row) -> list:
+        (entry_id, user_id, email, full_name, location_id, location_name,
+         clock_in, clock_out, duration, in_lat, in_lng, out_lat, out_lng, notes) = row
+        return [
+            entry_id, user_id, email, full_name, location_id, location_name,
+            _isoformat(clock_in), _isoformat(clock_out), duration,
+            in_lat, in_lng, out_lat, out_lng, notes,
+        ]
+
+    @staticmethod
+    async def _partitions(query: Select, chunk_size: int) -> AsyncIterator[list]:
+        """
+        Rows in chunks from a server-side cursor. The export owns its session
+        so the cursor stays open for as long as the response is streaming.
+        """
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query.execution_options(yield_per=chunk_size))
+            async for partition in result.partitions():
+                yield partition
+
+    @staticmethod
+    async def stream(query: Select, format: ExportFormat) -> AsyncIterator[str]:
+        """Encode the query results chunk by chunk; memory is bounded by the chunk size"""
+        chunk_size = settings.EXPORT_CHUNK_SIZE
+
+        if format == ExportFormat.NDJSON:
+            async for partition in ExportService._partitions(query, chunk_size):
+                yield "".join(
+                    json.dumps(dict(zip(EXPORT_COLUMNS, ExportService._record(row)))) + "\n"
+                    for row in partition
+                )
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # Header goes out before the query runs, so the first byte is immediate
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue()
+        async for partition in ExportService._partitions(query, chunk_size):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(ExportService._record(row) for row in partition)
+            yield buffer.getvalue()
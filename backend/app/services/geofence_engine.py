@@ -0,0 +1,71 @@
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.location import Location
+
+# Mean Earth radius (IUGG) in meters
+EARTH_RADIUS_METERS = 6371008.8
+
+
+def haversine_meters(
+    lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray
+) -> np.ndarray:
+    """
+    Great-circle distance in meters between points given in radians.
+    Inputs broadcast against each other like any NumPy ufunc.
+    """
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    a = np.sin(dlat / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def distance_meters(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """haversine_meters between two points given in degrees"""
+    return float(haversine_meters(*np.radians([lat1, lng1, lat2, lng2])))
+
+
+class GeofenceEngine:
+    """
+    Holds site coordinates in contiguous arrays so distances from one or
+    many positions to every site are computed in a single vectorized pass
+    instead of one geodesic() call per site.
+
+    Distances use the haversine formula on a spherical Earth, which is within
+    0.5% of the ellipsoidal geodesic - well below GPS accuracy at geofence scale.
+    """
+
+    def __init__(self, locations: Sequence[Location]):
+        self.locations = list(locations)
+        table = np.array(
+            [(location.latitude, location.longitude) for location in self.locations],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+
+        self.ids = np.array([location.id for location in self.locations], dtype=np.int64)
+        self.latitudes = np.ascontiguousarray(np.radians(table[:, 0]))
+        self.longitudes = np.ascontiguousarray(np.radians(table[:, 1]))
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def distances(self, user_lat: float, user_lng: float) -> np.ndarray:
+        """Distance in meters from a single position to every site"""
+        return haversine_meters(
+            np.radians(user_lat), np.radians(user_lng), self.latitudes, self.longitudes
+        )
+
+    def distance_matrix(self, user_lats: Sequence[float], user_lngs: Sequence[float]) -> np.ndarray:
+        """Distances in meters with shape (positions, sites)"""
+        lats = np.radians(np.asarray(user_lats, dtype=np.float64))[:, np.newaxis]
+        lngs = np.radians(np.asarray(user_lngs, dtype=np.float64))[:, np.newaxis]
+        return haversine_meters(lats, lngs, self.latitudes, self.longitudes)
+
+    def nearest(self, user_lat: float, user_lng: float) -> Tuple[Optional[Location], float]:
+        """Nearest site and its distance in meters"""
+        if not self.locations:
+            return None, float("inf")
+        distances = self.distances(user_lat, user_lng)
+        idx = int(np.argmin(distances))
+        return self.locations[idx], float(distances[idx])
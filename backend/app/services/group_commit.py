@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.time_entry import TimeEntry
+
+logger = logging.getLogger(__name__)
+
+# A clock-in/clock-out write: validates, then adds or modifies one entry in
+# the given session and returns it. It must not flush; the writer does.
+TimeEntryWrite = Callable[[AsyncSession], Awaitable[TimeEntry]]
+
+
+class GroupCommitWriter:
+    """
+    Group commit for time entry writes. Writes submitted by concurrent
+    requests are collected for up to max_wait_ms (or until max_batch_size
+    are waiting), run one after another in a shared session and committed
+    in a single transaction, so a burst of clock-ins pays for one commit
+    instead of one each. Each write is flushed before the next one runs, so
+    later writes in the batch see earlier ones, and the unflushed changes of
+    a write that raises are discarded, so it only fails its own request.
+    (Savepoints would do the same, but pysqlite commits a SAVEPOINT opened
+    as the first statement of a transaction on RELEASE.) If a flush or the
+    batch commit fails, the writes are retried with one commit each. After
+    the commit, the client of every write is marked for read-your-writes, as
+    if it had committed itself.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[TimeEntryWrite, Optional[str], asyncio.Future]] = []
+        self._batch_full: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def submit(self, write: TimeEntryWrite, client_key: Optional[str] = None) -> TimeEntry:
+        """
+        Queue a write and wait until the batch holding it has committed.
+        client_key is the read-your-writes key of the requesting client.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((write, client_key, future))
+        if self._flusher is None:
+            self._batch_full = asyncio.Event()
+            self._flusher = asyncio.create_task(self._run())
+        elif len(self._pending) >= self.max_batch_size:
+            self._batch_full.set()
+        return await future
+
+    async def _run(self) -> None:
+        try:
+            while self._pending:
+                if len(self._pending) < self.max_batch_size:
+                    try:
+                        await asyncio.wait_for(self._batch_full.wait(), self.max_wait)
+                    except asyncio.TimeoutError:
+                        pass
+                self._batch_full.clear()
+                batch = self._pending[: self.max_batch_size]
+                del self._pending[: self.max_batch_size]
+                await self._commit_batch(batch)
+        finally:
+            self._flusher = None
+
+    async def _commit_batch(
+        self, batch: List[Tuple[TimeEntryWrite, Optional[str], asyncio.Future]]
+    ) -> None:
+        outcomes = []
+        try:
+            async with AsyncSessionLocal() as db:
+                for write, client_key, future in batch:
+                    try:
+                        entry = await write(db)
+                    except Exception as exc:
+                        self._discard(db)
+                        outcomes.append((future, None, exc))
+                        continue
+                    await db.flush()  # A failed flush spoils the whole transaction
+                    outcomes.append((future, entry, None))
+                # Committed on behalf of these clients; see RoutingAsyncSession.commit
+                db.info["client_keys"] = [
+                    client_key
+                    for (_, client_key, _), (_, _, error) in zip(batch, outcomes)
+                    if error is None
+                ]
+                await db.commit()
+                await self._reload(db, [entry for _, entry, _ in outcomes if entry is not None])
+        except Exception as exc:
+            if len(batch) == 1:
+                self._resolve(batch[0][2], None, exc)
+                return
+            logger.warning("Group commit of %d writes failed, retrying one by one: %s", len(batch), exc)
+            for item in batch:
+                await self._commit_batch([item])
+            return
+
+        for future, entry, error in outcomes:
+            self._resolve(future, entry, error)
+
+    @staticmethod
+    def _discard(db: AsyncSession) -> None:
+        """Drop the pending changes of a failed write; earlier writes are already flushed"""
+        for obj in list(db.new) + list(db.deleted):
+            db.expunge(obj)
+        for obj in list(db.dirty):
+            db.expire(obj)
+
+    @staticmethod
+    async def _reload(db: AsyncSession, entries: List[TimeEntry]) -> None:
+        """Load server-generated columns of every committed entry with one query"""
+        if entries:
+            await db.execute(
+                select(TimeEntry)
+                .where(TimeEntry.id.in_([entry.id for entry in entries]))
+                .execution_options(populate_existing=True)
+            )
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, entry: Optional[TimeEntry], error: Optional[Exception]) -> None:
+        if future.done():  # The request went away; its write still stands
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(entry)
+
+
+async def commit_time_entry_write(db: AsyncSession, write: TimeEntryWrite) -> TimeEntry:
+    """Run a write through the group-commit writer, or commit it directly in the request's session"""
+    if settings.GROUP_COMMIT_ENABLED:
+        return await time_entry_writer.submit(write, db.info.get("client_key"))
+    entry = await write(db)
+    await db.commit()
+    await db.refresh(entry)
+    return entry
+
+
+# Process-wide writer shared by the clock-in and clock-out endpoints
+time_entry_writer = GroupCommitWriter(
+    max_batch_size=settings.GROUP_COMMIT_MAX_BATCH_SIZE,
+    max_wait_ms=settings.GROUP_COMMIT_MAX_WAIT_MS,
+)
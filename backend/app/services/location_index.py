@@ -0,0 +1,210 @@
+import heapq
+import math
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.location import Location
+from app.services.geofence_engine import EARTH_RADIUS_METERS, GeofenceEngine, haversine_meters
+
+# Meters per degree of latitude on the mean-radius sphere
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_METERS / 180.0
+
+Cell = Tuple[int, int]
+
+
+class IndexedSite(NamedTuple):
+    id: int
+    latitude: float
+    longitude: float
+    radius_meters: float
+
+
+class LocationIndex:
+    """
+    Spatial grid index over active locations.
+
+    Sites are bucketed into fixed-size lat/lng cells (a geohash-style grid).
+    A k-nearest query only inspects rings of cells around the query point until
+    the k-th best distance is closer than anything an outer ring could contain,
+    so its cost depends on local site density rather than the total number of
+    sites. Writes update a single cell in place.
+
+    A query far from every site would walk a great many empty rings, so after
+    max_rings the walk stops and the query is answered by one vectorized pass
+    over a GeofenceEngine holding every site. The engine is built on first
+    use and kept until the next write.
+    """
+
+    def __init__(self, cell_degrees: float = 0.05, max_rings: int = 8):
+        self.cell_degrees = cell_degrees
+        self.max_rings = max_rings
+        self._columns = int(round(360.0 / cell_degrees))
+        self._cells: Dict[Cell, Dict[int, IndexedSite]] = {}
+        self._cell_of: Dict[int, Cell] = {}
+        self._engine: Optional[GeofenceEngine] = None
+        self._lock = threading.RLock()
+        self._loaded_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._cell_of)
+
+    def _cell(self, lat: float, lng: float) -> Cell:
+        row = int(math.floor(lat / self.cell_degrees))
+        column = int(math.floor(lng / self.cell_degrees)) % self._columns
+        return row, column
+
+    def load(self, locations) -> None:
+        """Replace the index contents with the given active locations"""
+        with self._lock:
+            self._cells.clear()
+            self._cell_of.clear()
+            self._engine = None
+            for location in locations:
+                self._insert(location)
+            self._loaded_at = time.monotonic()
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Load from the database on first use or once the refresh interval has passed"""
+        if (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < settings.LOCATION_INDEX_REFRESH_SECONDS
+        ):
+            return
+        result = await db.execute(
+            select(Location.id, Location.latitude, Location.longitude, Location.radius_meters)
+            .where(Location.is_active == True)
+        )
+        self.load(result.all())
+
+    def upsert(self, location: Location) -> None:
+        """Add or move a location; inactive locations are dropped from the index"""
+        with self._lock:
+            self._remove(location.id)
+            if location.is_active:
+                self._insert(location)
+
+    def remove(self, location_id: int) -> None:
+        """Drop a location from the index"""
+        with self._lock:
+            self._remove(location_id)
+
+    def _insert(self, location) -> None:
+        site = IndexedSite(location.id, location.latitude, location.longitude, location.radius_meters)
+        cell = self._cell(site.latitude, site.longitude)
+        self._cells.setdefault(cell, {})[site.id] = site
+        self._cell_of[site.id] = cell
+        self._engine = None
+
+    def _remove(self, location_id: int) -> None:
+        cell = self._cell_of.pop(location_id, None)
+        if cell is None:
+            return
+        self._engine = None
+        bucket = self._cells[cell]
+        bucket.pop(location_id, None)
+        if not bucket:
+            del self._cells[cell]
+
+    def _ring(self, center: Cell, radius: int):
+        row, column = center
+        if radius == 0:
+            yield center
+            return
+        for d_column in range(-radius, radius + 1):
+            yield row - radius, (column + d_column) % self._columns
+            yield row + radius, (column + d_column) % self._columns
+        for d_row in range(-radius + 1, radius):
+            yield row + d_row, (column - radius) % self._columns
+            yield row + d_row, (column + radius) % self._columns
+
+    def _ring_min_distance(self, lat: float, radius: int) -> float:
+        """Lower bound in meters on the distance to any site in ring `radius`"""
+        if radius <= 1:
+            return 0.0
+        # Cells narrow towards the poles, so bound by the narrowest row the ring reaches
+        extreme_lat = min(90.0, abs(lat) + radius * self.cell_degrees)
+        cell_meters = self.cell_degrees * METERS_PER_DEGREE
+        cell_width = cell_meters * math.cos(math.radians(extreme_lat))
+        return (radius - 1) * min(cell_meters, cell_width)
+
+    def nearest(
+        self, lat: float, lng: float, k: int = 1, max_meters: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Return up to k (location_id, distance_meters) pairs ordered by distance
+        """
+        with self._lock:
+            if not self._cell_of:
+                return []
+
+            center = self._cell(lat, lng)
+            best: List[Tuple[float, int]] = []  # max-heap of (-distance, id)
+
+            radius = 0
+            while True:
+                # Past max_rings, or once a ring holds more cells than are
+                # occupied, one pass over every site is cheaper than the walk
+                if radius > self.max_rings or 8 * radius > len(self._cells):
+                    return self._scan(lat, lng, k, max_meters)
+
+                candidates = [
+                    site
+                    for cell in set(self._ring(center, radius))
+                    for site in self._cells.get(cell, {}).values()
+                ]
+                self._push(best, candidates, lat, lng, k, max_meters)
+
+                bound = self._ring_min_distance(lat, radius + 1)
+                if max_meters is not None and bound > max_meters:
+                    break
+                if len(best) >= k and -best[0][0] <= bound:
+                    break
+                radius += 1
+
+            return sorted(((location_id, -neg) for neg, location_id in best), key=lambda x: x[1])
+
+    def _scan(
+        self, lat: float, lng: float, k: int, max_meters: Optional[float]
+    ) -> List[Tuple[int, float]]:
+        """Exact k-nearest over every site in one vectorized pass"""
+        if self._engine is None:
+            self._engine = GeofenceEngine(
+                [site for bucket in self._cells.values() for site in bucket.values()]
+            )
+        distances = self._engine.distances(lat, lng)
+        if max_meters is not None:
+            candidates = np.flatnonzero(distances <= max_meters)
+        else:
+            candidates = np.arange(len(distances))
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(distances[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(distances[candidates], kind="stable")]
+        return [(int(self._engine.ids[i]), float(distances[i])) for i in candidates]
+
+    @staticmethod
+    def _push(best, candidates, lat, lng, k, max_meters) -> None:
+        if not candidates:
+            return
+        coords = np.radians(
+            np.array([(site.latitude, site.longitude) for site in candidates], dtype=np.float64)
+        )
+        distances = haversine_meters(
+            math.radians(lat), math.radians(lng), coords[:, 0], coords[:, 1]
+        )
+        for site, distance in zip(candidates, distances.tolist()):
+            if max_meters is not None and distance > max_meters:
+                continue
+            if len(best) < k:
+                heapq.heappush(best, (-distance, site.id))
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, site.id))
+
+
+# Process-wide index shared by the location endpoints and LocationService
+location_index = LocationIndex()
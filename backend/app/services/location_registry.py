@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.location import Location
+
+
+class LocationSnapshot:
+    """Compact, read-only copy of the location fields needed for geofencing"""
+
+    __slots__ = ("id", "name", "latitude", "longitude", "radius_meters", "is_active", "expires_at")
+
+    def __init__(self, location, expires_at: float):
+        self.id = location.id
+        self.name = location.name
+        self.latitude = location.latitude
+        self.longitude = location.longitude
+        self.radius_meters = location.radius_meters
+        self.is_active = location.is_active
+        self.expires_at = expires_at
+
+    def __repr__(self):
+        return f"<LocationSnapshot(id={self.id}, name='{self.name}', lat={self.latitude}, lng={self.longitude})>"
+
+
+class LocationRegistry:
+    """
+    Process-local, read-mostly cache of locations keyed by id.
+
+    Entries are bounded by an LRU size limit and expire after a TTL as a safety
+    net against writes made by other workers; the location write endpoints
+    refresh or invalidate entries directly.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, LocationSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, db: AsyncSession, location_id: int) -> Optional[LocationSnapshot]:
+        """Return a cached snapshot, loading it from the database on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            snapshot = self._entries.get(location_id)
+            if snapshot is not None and snapshot.expires_at > now:
+                self._entries.move_to_end(location_id)
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+
+        location = await db.get(Location, location_id)
+        if location is None:
+            self.invalidate(location_id)
+            return None
+        return self.refresh(location)
+
+    def refresh(self, location: Location) -> LocationSnapshot:
+        """Store the current state of a location"""
+        snapshot = LocationSnapshot(location, time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            self._entries[location.id] = snapshot
+            self._entries.move_to_end(location.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, location_id: int) -> None:
+        """Drop a location so the next lookup reloads it"""
+        with self._lock:
+            self._entries.pop(location_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    async def warm(self, db: AsyncSession) -> int:
+        """Preload active locations up to the size limit"""
+        result = await db.scalars(
+            select(Location).where(Location.is_active == True).limit(self.max_size)
+        )
+        locations = result.all()
+        for location in locations:
+            self.refresh(location)
+        return len(locations)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Process-wide registry used on the clock-in path
+location_registry = LocationRegistry(
+    max_size=settings.LOCATION_REGISTRY_MAX_SIZE,
+    ttl_seconds=settings.LOCATION_REGISTRY_TTL_SECONDS,
+)
@@ -1,7 +1,9 @@
-from geopy.distance import geodesic
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.location import Location
 from app.core.config import settings
+from app.services.geofence_engine import distance_meters
+from app.services.location_index import location_index
+from app.services.location_registry import location_registry
 
 class LocationService:
     @staticmethod
@@ -11,12 +13,10 @@ class LocationService:
         location: Location
     ) -> bool:
         """
-        Check if user coordinates are within the location's geofence
+        Check if user coordinates are within the location's geofence, with
+        the same distance as the batch punch endpoint and the location index
         """
-        location_coords = (location.latitude, location.longitude)
-        user_coords = (user_lat, user_lng)
-        
-        distance = geodesic(location_coords, user_coords).meters
+        distance = LocationService.get_distance_to_location(user_lat, user_lng, location)
         return distance <= location.radius_meters
     
     @staticmethod
@@ -28,41 +28,29 @@ class LocationService:
         """
         Get distance in meters from user to location
         """
-        location_coords = (location.latitude, location.longitude)
-        user_coords = (user_lat, user_lng)
-        
-        return geodesic(location_coords, user_coords).meters
+        return distance_meters(location.latitude, location.longitude, user_lat, user_lng)
     
     @staticmethod
-    def find_nearest_location(
-        db: Session, 
+    async def find_nearest_location(
+        db: AsyncSession, 
         user_lat: float, 
         user_lng: float
     ) -> Location:
         """
         Find the nearest active location to the user
         """
-        locations = db.query(Location).filter(Location.is_active == True).all()
+        await location_index.ensure_loaded(db)
+        matches = location_index.nearest(user_lat, user_lng, k=1)
         
-        if not locations:
+        if not matches:
             return None
         
-        nearest_location = None
-        min_distance = float('inf')
-        
-        for location in locations:
-            distance = LocationService.get_distance_to_location(
-                user_lat, user_lng, location
-            )
-            if distance < min_distance:
-                min_distance = distance
-                nearest_location = location
-        
-        return nearest_location
+        location_id, _ = matches[0]
+        return await db.get(Location, location_id)
     
     @staticmethod
-    def validate_location_access(
-        db: Session, 
+    async def validate_location_access(
+        db: AsyncSession, 
         location_id: int, 
         user_lat: float, 
         user_lng: float
@@ -71,7 +59,7 @@ class LocationService:
         Validate if user can access a specific location
         Returns (is_valid, error_message)
         """
-        location = db.query(Location).filter(Location.id == location_id).first()
+        location = await location_registry.get(db, location_id)
         
         if not location:
             return False, "Location not found"
@@ -80,7 +68,6 @@ class LocationService:
             return False, "Location is not active"
         
         if not LocationService.is_within_geofence(user_lat, user_lng, location):
-            print(user_lat, user_lng, location)
             distance = LocationService.get_distance_to_location(user_lat, user_lng, location)
             return False, f"You are {distance:.0f}m away from the work area"
         
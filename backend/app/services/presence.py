@@ -0,0 +1,189 @@
+import asyncio
+import json
+import logging
+from typing import List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.time_entry import TimeEntry
+from app.schemas.time_entry import PresenceEntry, PresenceEvent, PresenceEventType
+
+logger = logging.getLogger(__name__)
+
+# Returned by Subscription.next() once the subscriber has gone away
+CLOSED = object()
+
+
+class Subscription:
+    """One live feed connection: a bounded queue of events for one location or all"""
+
+    __slots__ = ("location_id", "queue", "overflowed", "closed")
+
+    def __init__(self, location_id: Optional[int], queue_size: int):
+        self.location_id = location_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False  # Events were dropped; the feed must resync
+        self.closed = False
+
+    def offer(self, event: dict) -> None:
+        if self.closed or self.overflowed:
+            return
+        if self.location_id is not None:
+            entries = [e for e in event["entries"] if e["location_id"] == self.location_id]
+            if not entries:
+                return
+            event = {"type": event["type"], "entries": entries}
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def close(self) -> None:
+        self.closed = True
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+    def resynced(self) -> None:
+        """Drop buffered events after a fresh snapshot has been sent"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.overflowed = False
+
+    async def next(self, timeout: float):
+        """Next event, None on timeout, or CLOSED"""
+        if self.closed:
+            return CLOSED
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return CLOSED if event is None else event
+
+
+class PresenceBroker:
+    """
+    Fan-out of clock-in/clock-out deltas to live feed subscribers.
+
+    Handlers publish after committing. With the redis backend, events go
+    through a pub/sub channel so every worker's subscribers see them; if
+    Redis is unavailable they are delivered to this worker only. Each
+    subscriber has a bounded queue, and one that falls behind is marked for
+    a resync instead of slowing publishers down.
+    """
+
+    def __init__(self, backend: str, channel: str, queue_size: int):
+        self.backend = backend
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscription] = set()
+        self._client = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, location_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(location_id, self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        self._subscribers.discard(subscription)
+
+    def deliver(self, event: dict) -> None:
+        """Hand an event to every subscriber of this worker"""
+        for subscription in list(self._subscribers):
+            subscription.offer(event)
+
+    async def publish(self, type: PresenceEventType, entries: List[PresenceEntry]) -> None:
+        """Publish a delta; never raises, the feed is best effort"""
+        if not entries:
+            return
+        event = PresenceEvent(type=type, entries=entries).model_dump(mode="json")
+        if self._client is not None:
+            try:
+                await self._client.publish(self.channel, json.dumps(event))
+                return
+            except Exception as exc:
+                logger.warning("Presence relay publish failed: %s", exc)
+        self.deliver(event)
+
+    async def start(self) -> None:
+        """Connect the Redis relay, if configured"""
+        if self.backend != "redis" or self._listener is not None:
+            return
+        from redis import asyncio as aioredis
+
+        self._client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        for subscription in list(self._subscribers):
+            self.unsubscribe(subscription)
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _listen(self) -> None:
+        """Relay channel messages to local subscribers, reconnecting on errors"""
+        while True:
+            try:
+                async with self._client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.deliver(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Presence relay disconnected: %s", exc)
+                await asyncio.sleep(5)
+
+
+async def load_snapshot(db: AsyncSession, location_id: Optional[int] = None) -> dict:
+    """Everyone currently clocked in, as a snapshot event"""
+    query = select(
+        TimeEntry.id, TimeEntry.user_id, TimeEntry.location_id, TimeEntry.clock_in_time
+    ).where(TimeEntry.clock_out_time.is_(None))
+    if location_id is not None:
+        query = query.where(TimeEntry.location_id == location_id)
+
+    entries = [
+        PresenceEntry(
+            entry_id=entry_id,
+            user_id=user_id,
+            location_id=entry_location_id,
+            clock_in_time=clock_in_time,
+        )
+        for entry_id, user_id, entry_location_id, clock_in_time in await db.execute(query)
+    ]
+    return PresenceEvent(type=PresenceEventType.SNAPSHOT, entries=entries).model_dump(mode="json")
+
+
+def presence_entry(entry: TimeEntry) -> PresenceEntry:
+    return PresenceEntry(
+        entry_id=entry.id,
+        user_id=entry.user_id,
+        location_id=entry.location_id,
+        clock_in_time=entry.clock_in_time,
+    )
+
+
+# Process-wide broker shared by the time entry endpoints and the live feed
+presence_broker = PresenceBroker(
+    backend=settings.PRESENCE_BACKEND,
+    channel=settings.PRESENCE_CHANNEL,
+    queue_size=settings.PRESENCE_QUEUE_SIZE,
+)
@@ -0,0 +1,248 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.timeutils import to_utc_naive
+from app.models.location import Location
+from app.models.time_entry import TimeEntry, TimeEntryType
+from app.models.user import User, UserRole
+from app.schemas.time_entry import PresenceEntry, PresenceEventType, PunchEvent, PunchResult
+from app.services.geofence_engine import haversine_meters
+from app.services.presence import presence_broker
+from app.services.rollup_service import RollupService
+
+# Tolerated clock skew between devices and the server
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+
+class _OpenEntry:
+    """Per-user pairing state while replaying punches"""
+
+    __slots__ = ("entry_id", "location_id", "clock_in_time", "row", "row_index")
+
+    def __init__(self, location_id: int, clock_in_time: datetime, entry_id: Optional[int] = None,
+                 row: Optional[dict] = None, row_index: Optional[int] = None):
+        self.entry_id = entry_id  # Set for entries already in the database
+        self.location_id = location_id
+        self.clock_in_time = clock_in_time
+        self.row = row  # Insert parameters for entries opened in this batch
+        self.row_index = row_index
+
+
+class PunchSyncService:
+    @staticmethod
+    async def apply(
+        db: AsyncSession,
+        punches: List[PunchEvent],
+        caller_id: int,
+        caller_role: UserRole,
+    ) -> List[PunchResult]:
+        """
+        Validate, pair and persist a batch of buffered punches in one transaction.
+        Returns one result per punch, in request order.
+        """
+        results: List[Optional[PunchResult]] = [None] * len(punches)
+        is_manager = caller_role in ["manager", "admin"]
+        now = datetime.utcnow()
+
+        def reject(index: int, error: str) -> None:
+            results[index] = PunchResult(index=index, accepted=False, error=error)
+
+        user_ids = [punch.user_id or caller_id for punch in punches]
+        timestamps = [to_utc_naive(punch.timestamp) for punch in punches]
+
+        # Load everything the batch needs with one query per table
+        active_users = set(
+            (await db.scalars(
+                select(User.id).where(User.id.in_(list(set(user_ids))), User.is_active == True)
+            )).all()
+        )
+        location_ids = {p.location_id for p in punches if p.location_id is not None}
+        locations: Dict[int, Location] = {
+            location.id: location
+            for location in await db.scalars(
+                select(Location).where(Location.id.in_(list(location_ids)))
+            )
+        }
+        open_entries: Dict[int, _OpenEntry] = {
+            user_id: _OpenEntry(location_id, to_utc_naive(clock_in_time), entry_id=entry_id)
+            for entry_id, user_id, location_id, clock_in_time in await db.execute(
+                select(
+                    TimeEntry.id, TimeEntry.user_id, TimeEntry.location_id, TimeEntry.clock_in_time
+                ).where(
+                    TimeEntry.user_id.in_(list(active_users)),
+                    TimeEntry.clock_out_time.is_(None),
+                )
+            )
+        }
+
+        # Bulk geofence check of every clock-in against its own location
+        geofence_errors = PunchSyncService._check_geofences(punches, locations)
+
+        inserts: List[dict] = []
+        insert_owners: List[List[int]] = []  # Punch indexes resolved by each insert
+        updates: List[dict] = []
+        update_owners: List[int] = []
+        closed: List[tuple] = []  # Rollup intervals of entries closed by this batch
+        clocked_out: List[PresenceEntry] = []  # Previously open entries closed by this batch
+
+        order = sorted(range(len(punches)), key=lambda i: (user_ids[i], timestamps[i], i))
+        for index in order:
+            punch = punches[index]
+            user_id = user_ids[index]
+            timestamp = timestamps[index]
+
+            if user_id != caller_id and not is_manager:
+                reject(index, "Not enough permissions")
+                continue
+            if user_id not in active_users:
+                reject(index, "User not found or inactive")
+                continue
+            if timestamp > now + MAX_CLOCK_SKEW:
+                reject(index, "Timestamp is in the future")
+                continue
+
+            current = open_entries.get(user_id)
+
+            if punch.type == TimeEntryType.CLOCK_IN:
+                if current is not None:
+                    reject(index, "Already clocked in")
+                    continue
+                if index in geofence_errors:
+                    reject(index, geofence_errors[index])
+                    continue
+
+                row = {
+                    "user_id": user_id,
+                    "location_id": punch.location_id,
+                    "type": TimeEntryType.CLOCK_IN,
+                    "clock_in_time": timestamp,
+                    "clock_in_latitude": punch.latitude,
+                    "clock_in_longitude": punch.longitude,
+                    "clock_in_accuracy": punch.accuracy,
+                    "clock_out_time": None,
+                    "clock_out_latitude": None,
+                    "clock_out_longitude": None,
+                    "clock_out_accuracy": None,
+                    "notes": punch.notes,
+                }
+                inserts.append(row)
+                insert_owners.append([index])
+                open_entries[user_id] = _OpenEntry(
+                    punch.location_id, timestamp, row=row, row_index=len(inserts) - 1
+                )
+                continue
+
+            if current is None:
+                reject(index, "Not currently clocked in")
+                continue
+            if timestamp < current.clock_in_time:
+                reject(index, "Clock-out precedes clock-in")
+                continue
+
+            clock_out = {
+                "clock_out_time": timestamp,
+                "clock_out_latitude": punch.latitude,
+                "clock_out_longitude": punch.longitude,
+                "clock_out_accuracy": punch.accuracy,
+            }
+            if current.row is not None:
+                current.row.update(clock_out)
+                if punch.notes:
+                    current.row["notes"] = (
+                        current.row["notes"] or ""
+                    ) + f"\nClock out notes: {punch.notes}"
+                insert_owners[current.row_index].append(index)
+            else:
+                if punch.notes:
+                    clock_out["notes"] = punch.notes
+                updates.append({"id": current.entry_id, **clock_out})
+                update_owners.append(index)
+                clocked_out.append(PresenceEntry(
+                    entry_id=current.entry_id,
+                    user_id=user_id,
+                    location_id=current.location_id,
+                    clock_in_time=current.clock_in_time,
+                ))
+            closed.append((user_id, current.location_id, current.clock_in_time, timestamp))
+            del open_entries[user_id]
+
+        # Persist the whole batch in one transaction
+        clocked_in: List[PresenceEntry] = []
+        if inserts:
+            entry_ids = (await db.scalars(
+                insert(TimeEntry).returning(TimeEntry.id, sort_by_parameter_order=True),
+                inserts,
+            )).all()
+            for row, owners, entry_id in zip(inserts, insert_owners, entry_ids):
+                for index in owners:
+                    results[index] = PunchResult(index=index, accepted=True, entry_id=entry_id)
+                if row["clock_out_time"] is None:
+                    clocked_in.append(PresenceEntry(
+                        entry_id=entry_id,
+                        user_id=row["user_id"],
+                        location_id=row["location_id"],
+                        clock_in_time=row["clock_in_time"],
+                    ))
+
+        if updates:
+            await PunchSyncService._append_clock_out_notes(db, updates)
+            await db.execute(update(TimeEntry), updates)
+            for index, row in zip(update_owners, updates):
+                results[index] = PunchResult(index=index, accepted=True, entry_id=row["id"])
+
+        await RollupService.record(db, closed)
+        await db.commit()
+
+        await presence_broker.publish(PresenceEventType.CLOCK_OUT, clocked_out)
+        await presence_broker.publish(PresenceEventType.CLOCK_IN, clocked_in)
+        return results
+
+    @staticmethod
+    def _check_geofences(punches: List[PunchEvent], locations: Dict[int, Location]) -> Dict[int, str]:
+        """Geofence errors keyed by punch index, computed in one vectorized pass"""
+        errors: Dict[int, str] = {}
+        candidates = []
+        for index, punch in enumerate(punches):
+            if punch.type != TimeEntryType.CLOCK_IN:
+                continue
+            location = locations.get(punch.location_id)
+            if punch.location_id is None:
+                errors[index] = "location_id is required to clock in"
+            elif location is None:
+                errors[index] = "Location not found"
+            elif not location.is_active:
+                errors[index] = "Location is not active"
+            else:
+                candidates.append((index, punch, location))
+
+        if not candidates:
+            return errors
+
+        table = np.radians(np.array(
+            [(p.latitude, p.longitude, loc.latitude, loc.longitude) for _, p, loc in candidates],
+            dtype=np.float64,
+        ))
+        radii = np.array([loc.radius_meters for _, _, loc in candidates], dtype=np.float64)
+        distances = haversine_meters(table[:, 0], table[:, 1], table[:, 2], table[:, 3])
+
+        for (index, _, _), distance, radius in zip(candidates, distances.tolist(), radii.tolist()):
+            if distance > radius:
+                errors[index] = f"You are {distance:.0f}m away from the work area"
+        return errors
+
+    @staticmethod
+    async def _append_clock_out_notes(db: AsyncSession, updates: List[dict]) -> None:
+        """Clock-out notes are appended to existing notes, as in the clock-out endpoint"""
+        with_notes = {row["id"]: row for row in updates if "notes" in row}
+        if not with_notes:
+            return
+        existing = await db.execute(
+            select(TimeEntry.id, TimeEntry.notes).where(TimeEntry.id.in_(with_notes))
+        )
+        for entry_id, notes in existing:
+            row = with_notes[entry_id]
+            row["notes"] = (notes or "") + f"\nClock out notes: {row['notes']}"
@@ -0,0 +1,214 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.timeutils import to_utc_naive
+from app.models.daily_hours import DailyHours
+from app.models.time_entry import TimeEntry
+from app.schemas.time_entry import HoursReportRow, ReportPeriod
+
+# (user_id, location_id, clock_in_time, clock_out_time) of a closed entry
+Interval = Tuple[int, int, datetime, datetime]
+RollupKey = Tuple[int, int, date]
+
+UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def split_by_day(start: datetime, end: datetime) -> List[Tuple[date, int]]:
+    """Seconds worked on each UTC day between start and end"""
+    start, end = to_utc_naive(start), to_utc_naive(end)
+    parts = []
+    while start < end:
+        midnight = datetime.combine(start.date() + timedelta(days=1), time.min)
+        part_end = min(end, midnight)
+        parts.append((start.date(), int((part_end - start).total_seconds())))
+        start = part_end
+    return parts
+
+
+class RollupService:
+    @staticmethod
+    def interval(entry: TimeEntry) -> Optional[Interval]:
+        """Rollup interval of an entry, or None while it is still open"""
+        if entry.clock_out_time is None:
+            return None
+        return entry.user_id, entry.location_id, entry.clock_in_time, entry.clock_out_time
+
+    @staticmethod
+    def aggregate(intervals: Iterable[Interval], sign: int = 1) -> Dict[RollupKey, List[int]]:
+        """Fold intervals into [seconds, entry_count] deltas per rollup key"""
+        deltas: Dict[RollupKey, List[int]] = defaultdict(lambda: [0, 0])
+        for user_id, location_id, clock_in, clock_out in intervals:
+            for day, seconds in split_by_day(clock_in, clock_out):
+                delta = deltas[(user_id, location_id, day)]
+                delta[0] += sign * seconds
+                delta[1] += sign
+        return deltas
+
+    @staticmethod
+    def _rows(deltas: Dict[RollupKey, List[int]]) -> List[dict]:
+        return [
+            {
+                "user_id": user_id,
+                "location_id": location_id,
+                "day": day,
+                "worked_seconds": seconds,
+                "entry_count": count,
+            }
+            for (user_id, location_id, day), (seconds, count) in deltas.items()
+        ]
+
+    @staticmethod
+    async def apply(db: AsyncSession, deltas: Dict[RollupKey, List[int]]) -> None:
+        """
+        Add the deltas to the rollup with one upsert per key, or an update
+        and, for new keys, an insert on databases without ON CONFLICT. Runs
+        in the caller's transaction, so the rollup commits together with the
+        entries.
+        """
+        if not deltas:
+            return
+
+        upsert = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+        if upsert is None:
+            await RollupService._update_or_insert(db, deltas)
+        else:
+            statement = upsert(DailyHours)
+            statement = statement.on_conflict_do_update(
+                index_elements=[DailyHours.user_id, DailyHours.location_id, DailyHours.day],
+                set_={
+                    "worked_seconds": DailyHours.worked_seconds + statement.excluded.worked_seconds,
+                    "entry_count": DailyHours.entry_count + statement.excluded.entry_count,
+                    "updated_at": func.now(),
+                },
+            )
+            await db.execute(statement, RollupService._rows(deltas))
+
+        # Rows whose last entry was retracted are dropped
+        emptied = [key for key, (_, count) in deltas.items() if count < 0]
+        for user_id, location_id, day in emptied:
+            await db.execute(
+                delete(DailyHours).where(
+                    DailyHours.user_id == user_id,
+                    DailyHours.location_id == location_id,
+                    DailyHours.day == day,
+                    DailyHours.entry_count <= 0,
+                )
+            )
+
+    @staticmethod
+    async def _update_or_insert(db: AsyncSession, deltas: Dict[RollupKey, List[int]]) -> None:
+        """Portable apply: add to existing rows, insert the keys no row matched"""
+        for row in RollupService._rows(deltas):
+            result = await db.execute(
+                update(DailyHours)
+                .where(
+                    DailyHours.user_id == row["user_id"],
+                    DailyHours.location_id == row["location_id"],
+                    DailyHours.day == row["day"],
+                )
+                .values(
+                    worked_seconds=DailyHours.worked_seconds + row["worked_seconds"],
+                    entry_count=DailyHours.entry_count + row["entry_count"],
+                    updated_at=func.now(),
+                )
+            )
+            if result.rowcount == 0:
+                await db.execute(insert(DailyHours).values(**row))
+
+    @staticmethod
+    async def record(db: AsyncSession, intervals: Iterable[Interval]) -> None:
+        """Add closed entries to the rollup"""
+        await RollupService.apply(db, RollupService.aggregate(intervals))
+
+    @staticmethod
+    async def replace(db: AsyncSession, old: Optional[Interval], new: Optional[Interval]) -> None:
+        """Move an edited entry's contribution from its old interval to its new one"""
+        if old == new:
+            return
+        deltas = RollupService.aggregate([old] if old else [], sign=-1)
+        for key, (seconds, count) in RollupService.aggregate([new] if new else []).items():
+            delta = deltas.setdefault(key, [0, 0])
+            delta[0] += seconds
+            delta[1] += count
+        await RollupService.apply(db, deltas)
+
+    @staticmethod
+    async def report(
+        db: AsyncSession,
+        start: date,
+        end: date,
+        period: ReportPeriod = ReportPeriod.DAY,
+        user_id: Optional[int] = None,
+        location_id: Optional[int] = None,
+    ) -> List[HoursReportRow]:
+        """Worked time per user, location and day or week, between two days inclusive"""
+        query = select(
+            DailyHours.user_id,
+            DailyHours.location_id,
+            DailyHours.day,
+            DailyHours.worked_seconds,
+            DailyHours.entry_count,
+        ).where(DailyHours.day >= start, DailyHours.day <= end)
+        if user_id is not None:
+            query = query.where(DailyHours.user_id == user_id)
+        if location_id is not None:
+            query = query.where(DailyHours.location_id == location_id)
+        query = query.order_by(DailyHours.day, DailyHours.user_id, DailyHours.location_id)
+
+        # At most one row per user, location and day, so weeks are folded here
+        totals: Dict[RollupKey, List[int]] = {}
+        for row_user, row_location, day, seconds, count in await db.execute(query):
+            if period == ReportPeriod.WEEK:
+                day = day - timedelta(days=day.weekday())
+            total = totals.setdefault((row_user, row_location, day), [0, 0])
+            total[0] += seconds
+            total[1] += count
+
+        return [
+            HoursReportRow(
+                user_id=row_user,
+                location_id=row_location,
+                period_start=day,
+                worked_minutes=seconds // 60,
+                entry_count=count,
+            )
+            for (row_user, row_location, day), (seconds, count) in totals.items()
+        ]
+
+    @staticmethod
+    async def rebuild(db: AsyncSession) -> int:
+        """
+        Regenerate the rollup from every closed time entry in one transaction.
+        Entries are streamed; memory grows with the number of rollup rows only.
+        """
+        deltas: Dict[RollupKey, List[int]] = defaultdict(lambda: [0, 0])
+        result = await db.stream(
+            select(
+                TimeEntry.user_id,
+                TimeEntry.location_id,
+                TimeEntry.clock_in_time,
+                TimeEntry.clock_out_time,
+            )
+            .where(TimeEntry.clock_out_time.is_not(None))
+            .execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+        )
+        async for partition in result.partitions():
+            for key, (seconds, count) in RollupService.aggregate(partition).items():
+                delta = deltas[key]
+                delta[0] += seconds
+                delta[1] += count
+
+        await db.execute(delete(DailyHours))
+        if deltas:
+            await db.execute(DailyHours.__table__.insert(), RollupService._rows(deltas))
+        await db.commit()
+        return len(deltas)
@@ -0,0 +1,82 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.location import Location
+from app.models.time_entry import TimeEntry
+from app.schemas.time_entry import DaySummary, LocationSummary, TimesheetSummary
+
+
+class TimesheetService:
+    @staticmethod
+    async def summary(
+        db: AsyncSession,
+        user_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        overtime_after_minutes: Optional[int] = None,
+    ) -> TimesheetSummary:
+        """
+        Worked minutes of a user's closed entries in the period, totalled per
+        clock-in day and per location. All sums are computed by the database.
+        """
+        conditions = [
+            TimeEntry.user_id == user_id,
+            TimeEntry.clock_out_time.is_not(None),
+        ]
+        if start is not None:
+            conditions.append(TimeEntry.clock_in_time >= start)
+        if end is not None:
+            conditions.append(TimeEntry.clock_in_time < end)
+
+        minutes = func.coalesce(func.sum(TimeEntry.duration_minutes), 0)
+        day = func.date(TimeEntry.clock_in_time)
+
+        per_day = (
+            select(day.label("day"), minutes.label("minutes"))
+            .where(*conditions)
+            .group_by(day)
+            .subquery()
+        )
+        day_rows = (await db.execute(
+            select(per_day.c.day, per_day.c.minutes).order_by(per_day.c.day)
+        )).all()
+
+        entry_count, total_minutes = (await db.execute(
+            select(func.count(TimeEntry.id), minutes).where(*conditions)
+        )).one()
+
+        location_rows = (await db.execute(
+            select(TimeEntry.location_id, Location.name, minutes)
+            .join(Location, Location.id == TimeEntry.location_id)
+            .where(*conditions)
+            .group_by(TimeEntry.location_id, Location.name)
+            .order_by(TimeEntry.location_id)
+        )).all()
+
+        overtime_minutes = None
+        if overtime_after_minutes is not None:
+            # Minutes beyond the daily threshold, summed over days
+            overtime_minutes = await db.scalar(
+                select(func.coalesce(func.sum(case(
+                    (per_day.c.minutes > overtime_after_minutes,
+                     per_day.c.minutes - overtime_after_minutes),
+                    else_=0,
+                )), 0))
+            )
+
+        return TimesheetSummary(
+            user_id=user_id,
+            start=start,
+            end=end,
+            entry_count=entry_count,
+            total_minutes=total_minutes,
+            overtime_minutes=overtime_minutes,
+            days=[DaySummary(day=row_day, minutes=row_minutes) for row_day, row_minutes in day_rows],
+            locations=[
+                LocationSummary(location_id=location_id, location_name=name, minutes=row_minutes)
+                for location_id, name, row_minutes in location_rows
+            ],
+        )
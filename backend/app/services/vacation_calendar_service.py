@@ -0,0 +1,78 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.time_entry import TimeEntry
+from app.models.user import User
+from app.models.vacation_request import VacationRequest, VacationStatus
+
+# Longest range served by one calendar request
+MAX_CALENDAR_DAYS = 366
+
+# Absences shown on the calendar; rejected and cancelled requests are not
+CALENDAR_STATUSES = (VacationStatus.APPROVED, VacationStatus.PENDING)
+
+
+class VacationCalendarService:
+    @staticmethod
+    async def calendar(
+        db: AsyncSession,
+        start: date,
+        end: date,
+        location_id: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Approved and pending absences for every day between start and end
+        inclusive, as CalendarDay dicts. One range query over
+        ix_vacation_requests_date returns the absences in index order; they
+        are then swept into days and sorted by name. With a location, only
+        employees who have clocked in there are counted.
+        """
+        query = (
+            select(
+                VacationRequest.id,
+                VacationRequest.date,
+                VacationRequest.status,
+                VacationRequest.vacation_type,
+                User.id,
+                User.full_name,
+            )
+            .join(User, User.id == VacationRequest.user_id)
+            .where(
+                VacationRequest.date >= datetime.combine(start, time.min),
+                VacationRequest.date < datetime.combine(end + timedelta(days=1), time.min),
+                VacationRequest.status.in_(CALENDAR_STATUSES),
+            )
+        )
+        if location_id is not None:
+            query = query.where(
+                exists().where(
+                    TimeEntry.user_id == VacationRequest.user_id,
+                    TimeEntry.location_id == location_id,
+                )
+            )
+
+        days: Dict[date, dict] = {}
+        day = start
+        while day <= end:
+            days[day] = {"date": day, "approved": 0, "pending": 0, "absences": []}
+            day += timedelta(days=1)
+
+        for request_id, when, status, vacation_type, user_id, full_name in await db.execute(query):
+            calendar_day = days.get(when.date())
+            if calendar_day is None:
+                continue
+            calendar_day["approved" if status == VacationStatus.APPROVED else "pending"] += 1
+            calendar_day["absences"].append({
+                "request_id": request_id,
+                "user_id": user_id,
+                "full_name": full_name,
+                "status": status,
+                "vacation_type": vacation_type,
+            })
+
+        for calendar_day in days.values():
+            calendar_day["absences"].sort(key=lambda a: (a["full_name"], a["request_id"]))
+        return list(days.values())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the database layer: fast-request latency while
+slow queries are in flight, with a synchronous Session used inside async
+handlers (the old pattern) versus AsyncSession.
+
+Each mode runs a small uvicorn app with a /slow route (a query that sleeps)
+and a /fast route (SELECT 1). Workers keep --slow-concurrency slow requests
+in flight while fast requests arrive at --fast-rate per second.
+
+Usage: python -m benchmarks.async_db_benchmark [--database-url URL]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import create_engine, event, text  # noqa: E402
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,  # noqa: E402
+                                    create_async_engine)
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+from sqlalchemy.pool import AsyncAdaptedQueuePool  # noqa: E402
+
+from app.core.database import get_async_url  # noqa: E402
+
+
+def slow_query(url: str, seconds: float) -> str:
+    if url.startswith("postgresql"):
+        return f"SELECT pg_sleep({seconds})"
+    return f"SELECT sleep_ms({int(seconds * 1000)})"
+
+
+def install_sleep_function(engine) -> None:
+    """Give SQLite a server-side sleep so slow queries behave like real ones"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, _):
+        dbapi_connection.create_function("sleep_ms", 1, lambda ms: time.sleep(ms / 1000))
+
+
+def build_app(mode: str, url: str, slow_seconds: float) -> FastAPI:
+    app = FastAPI()
+    slow_sql = text(slow_query(url, slow_seconds))
+    fast_sql = text("SELECT 1")
+
+    if mode == "sync":
+        engine = create_engine(url, pool_size=32, max_overflow=0)
+        install_sleep_function(engine)
+        SyncSession = sessionmaker(bind=engine)
+
+        def get_db():
+            db = SyncSession()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        @app.get("/slow")
+        async def slow(db: Session = Depends(get_db)):
+            db.execute(slow_sql)
+            return {}
+
+        @app.get("/fast")
+        async def fast(db: Session = Depends(get_db)):
+            db.execute(fast_sql)
+            return {}
+
+    else:
+        engine = create_async_engine(
+            get_async_url(url), poolclass=AsyncAdaptedQueuePool, pool_size=32, max_overflow=0
+        )
+        install_sleep_function(engine.sync_engine)
+        AsyncSessionFactory = async_sessionmaker(bind=engine)
+
+        async def get_db():
+            async with AsyncSessionFactory() as db:
+                yield db
+
+        @app.get("/slow")
+        async def slow(db: AsyncSession = Depends(get_db)):
+            await db.execute(slow_sql)
+            return {}
+
+        @app.get("/fast")
+        async def fast(db: AsyncSession = Depends(get_db)):
+            await db.execute(fast_sql)
+            return {}
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def drive(base_url: str, duration: float, slow_concurrency: int, fast_rate: float):
+    fast_latencies = []
+    slow_count = 0
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+
+        async def slow_worker():
+            nonlocal slow_count
+            while time.perf_counter() < deadline:
+                await client.get("/slow")
+                slow_count += 1
+
+        async def fast_request():
+            start = time.perf_counter()
+            response = await client.get("/fast")
+            response.raise_for_status()
+            fast_latencies.append((time.perf_counter() - start) * 1000)
+
+        workers = [asyncio.create_task(slow_worker()) for _ in range(slow_concurrency)]
+        fast_tasks = []
+        while time.perf_counter() < deadline:
+            fast_tasks.append(asyncio.create_task(fast_request()))
+            await asyncio.sleep(1 / fast_rate)
+        await asyncio.gather(*workers, *fast_tasks)
+
+    return fast_latencies, slow_count
+
+
+def run_mode(mode: str, args) -> dict:
+    port = free_port()
+    app = build_app(mode, args.database_url, args.slow_ms / 1000)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    try:
+        latencies, slow_count = asyncio.run(
+            drive(f"http://127.0.0.1:{port}", args.duration, args.slow_concurrency, args.fast_rate)
+        )
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "mode": mode,
+        "fast_requests": len(latencies),
+        "slow_requests": slow_count,
+        "p50": percentiles[49],
+        "p95": percentiles[94],
+        "p99": percentiles[98],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--database-url",
+        default=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    parser.add_argument("--slow-ms", type=float, default=200.0)
+    parser.add_argument("--slow-concurrency", type=int, default=8)
+    parser.add_argument("--fast-rate", type=float, default=50.0, help="fast requests per second")
+    args = parser.parse_args()
+
+    print(f"{'mode':>6} {'fast reqs':>10} {'slow reqs':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for mode in ("sync", "async"):
+        result = run_mode(mode, args)
+        print(f"{result['mode']:>6} {result['fast_requests']:>10} {result['slow_requests']:>10} "
+              f"{result['p50']:>9.1f} {result['p95']:>9.1f} {result['p99']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the per-request cost of get_current_user with and without
+the principal cache, against a SQLite database and the in-memory cache
+backend by default. With CACHE_BACKEND=redis a hit also pays one GET round
+trip for the user's revocation version.
+
+Usage: python -m benchmarks.auth_cache_benchmark [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+os.environ.setdefault("CACHE_BACKEND", "memory")
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+
+from app.core.auth import get_current_user, principal_cache  # noqa: E402
+from app.core.database import AsyncSessionLocal, SessionLocal, get_engine  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.models import Base, User  # noqa: E402
+
+
+def seed_user(db) -> str:
+    user = User(
+        email="bench@timetrack.com",
+        username="bench",
+        full_name="Bench User",
+        hashed_password="x",
+    )
+    db.add(user)
+    db.commit()
+    return create_access_token(data={"sub": user.email})
+
+
+async def run(credentials, requests: int, cached: bool) -> float:
+    """Mean microseconds per authenticated request"""
+    principal_cache.clear()
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        for _ in range(requests):
+            if not cached:
+                principal_cache.clear()
+            await get_current_user(credentials=credentials, db=db)
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.query(User).filter(User.email == "bench@timetrack.com").first() is None:
+            token = seed_user(db)
+        else:
+            token = create_access_token(data={"sub": "bench@timetrack.com"})
+    finally:
+        db.close()
+
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    uncached = asyncio.run(run(credentials, args.requests, cached=False))
+    cached = asyncio.run(run(credentials, args.requests, cached=True))
+
+    print(f"database: {engine.url.get_backend_name()}, requests: {args.requests}")
+    print(f"jwt.decode + user query: {uncached:8.1f} us/request")
+    print(f"principal cache hit:     {cached:8.1f} us/request")
+    print(f"overhead removed:        {uncached - cached:8.1f} us/request ({uncached / cached:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized GeofenceEngine against the per-row geodesic loop
+previously used by LocationService.find_nearest_location.
+
+"reused" divides the loop time by a query against an engine built once and
+kept in memory; "rebuilt" also charges each query for building the engine,
+which is what a caller that constructs an engine per lookup pays (before the
+cost of loading the rows, which both columns leave out).
+
+Usage: python -m benchmarks.geofence_benchmark [--sizes 100 10000 100000]
+"""
+
+import argparse
+import os
+import random
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from geopy.distance import geodesic  # noqa: E402
+
+from app.services.geofence_engine import GeofenceEngine  # noqa: E402
+
+
+def make_sites(count: int, seed: int = 42):
+    """Random sites scattered around a metro area"""
+    rng = random.Random(seed)
+    return [
+        SimpleNamespace(
+            id=i,
+            latitude=40.7 + rng.uniform(-0.5, 0.5),
+            longitude=-74.0 + rng.uniform(-0.5, 0.5),
+            radius_meters=rng.randint(50, 300),
+        )
+        for i in range(count)
+    ]
+
+
+def geodesic_loop(sites, user_lat: float, user_lng: float):
+    """The original find_nearest_location loop"""
+    nearest_location = None
+    min_distance = float("inf")
+    for location in sites:
+        distance = geodesic((location.latitude, location.longitude), (user_lat, user_lng)).meters
+        if distance < min_distance:
+            min_distance = distance
+            nearest_location = location
+    return nearest_location
+
+
+def timed(fn, repeat: int) -> float:
+    """Best-of-N wall time in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--batch", type=int, default=100, help="positions per batch query")
+    args = parser.parse_args()
+
+    user_lat, user_lng = 40.7128, -74.0060
+    rng = random.Random(7)
+    batch_lats = [40.7 + rng.uniform(-0.5, 0.5) for _ in range(args.batch)]
+    batch_lngs = [-74.0 + rng.uniform(-0.5, 0.5) for _ in range(args.batch)]
+
+    print(f"{'sites':>8} {'geodesic loop':>15} {'engine build':>13} {'engine query':>13} "
+          f"{'reused':>9} {'rebuilt':>9} {f'batch x{args.batch}':>12}")
+    for size in args.sizes:
+        sites = make_sites(size)
+        repeat = 1 if size >= 100_000 else 3
+
+        loop_ms = timed(lambda: geodesic_loop(sites, user_lat, user_lng), repeat)
+        build_ms = timed(lambda: GeofenceEngine(sites), 3)
+        engine = GeofenceEngine(sites)
+        query_ms = timed(lambda: engine.nearest(user_lat, user_lng), 10)
+        batch_ms = timed(lambda: engine.distance_matrix(batch_lats, batch_lngs), 3)
+
+        expected = geodesic_loop(sites, user_lat, user_lng)
+        assert engine.nearest(user_lat, user_lng)[0].id == expected.id
+
+        print(f"{size:>8} {loop_ms:>12.2f} ms {build_ms:>10.2f} ms {query_ms:>10.3f} ms "
+              f"{loop_ms / query_ms:>8.0f}x {loop_ms / (build_ms + query_ms):>8.0f}x {batch_ms:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
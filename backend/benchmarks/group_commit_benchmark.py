@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Throughput of a clock-in/clock-out burst with per-request commits versus the
+group-commit writer (GROUP_COMMIT_ENABLED).
+
+Every employee clocks in at once, then clocks out at once, against the real
+app served by uvicorn in-process. Both modes run against the same database
+(DATABASE_URL, a fresh SQLite file by default) and report the number of
+open and closed entries they leave behind as a correctness check.
+
+Usage: python -m benchmarks.group_commit_benchmark [--users 200] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+# Imported first: it points DATABASE_URL and the cache/presence backends at local defaults
+from benchmarks.load_test import API, bearer, seed, serve_in_thread
+
+import httpx
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.database import SessionLocal, get_engine
+from app.models import TimeEntry
+
+
+# Commits of transactions that wrote, i.e. the ones that reach the disk
+commits = 0
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _note_write(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and (context.isinsert or context.isupdate or context.isdelete):
+        conn.info["wrote"] = True
+
+
+@event.listens_for(Engine, "commit")
+def _count_commit(conn):
+    global commits
+    if conn.info.pop("wrote", False):
+        commits += 1
+
+
+@event.listens_for(Engine, "rollback")
+def _forget_write(conn):
+    conn.info.pop("wrote", None)
+
+
+async def burst(client, kind: str, headers: list, body: dict):
+    """Fire one punch per employee at once; returns (wall seconds, latencies ms, errors)"""
+
+    async def punch(employee_headers):
+        start = time.perf_counter()
+        response = await client.post(f"{API}/time-entries/{kind}", headers=employee_headers, json=body)
+        return (time.perf_counter() - start) * 1000, response.status_code
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(punch(h) for h in headers))
+    wall = time.perf_counter() - start
+    return wall, [latency for latency, _ in outcomes], sum(code != 200 for _, code in outcomes)
+
+
+async def run_mode(base_url: str, data: dict, rounds: int) -> dict:
+    location_id, latitude, longitude = data["location"]
+    headers = [bearer(email) for email in data["employees"]]
+    clock_in = {"location_id": location_id, "latitude": latitude, "longitude": longitude}
+    clock_out = {"latitude": latitude, "longitude": longitude}
+
+    global commits
+    commits = 0
+    walls, latencies, errors = [], [], 0
+    limits = httpx.Limits(max_connections=len(headers))
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        for _ in range(rounds):
+            for kind, body in (("clock-in", clock_in), ("clock-out", clock_out)):
+                wall, round_latencies, round_errors = await burst(client, kind, headers, body)
+                walls.append(wall)
+                latencies += round_latencies
+                errors += round_errors
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "punches_per_second": len(latencies) / sum(walls),
+        "p50": percentiles[49],
+        "p95": percentiles[94],
+        "errors": errors,
+        "commits": commits,
+    }
+
+
+def entry_counts() -> tuple:
+    db = SessionLocal()
+    try:
+        open_entries = db.scalar(
+            select(func.count()).select_from(TimeEntry).where(TimeEntry.clock_out_time.is_(None))
+        )
+        closed_entries = db.scalar(
+            select(func.count()).select_from(TimeEntry).where(TimeEntry.clock_out_time.is_not(None))
+        )
+        return open_entries, closed_entries
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3, help="clock-in/clock-out bursts per mode")
+    args = parser.parse_args()
+
+    print(f"database: {get_engine().url.get_backend_name()}, users: {args.users}, "
+          f"batch: {settings.GROUP_COMMIT_MAX_BATCH_SIZE}, wait: {settings.GROUP_COMMIT_MAX_WAIT_MS} ms")
+    data = seed(args.users, managers=0)
+    base_url, server, thread = serve_in_thread()
+    try:
+        print(f"{'mode':>14} {'punches/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7} {'commits':>8} {'open/closed':>12}")
+        for mode, enabled in (("per-request", False), ("group commit", True)):
+            seed(args.users, managers=0)
+            settings.GROUP_COMMIT_ENABLED = enabled
+            result = asyncio.run(run_mode(base_url, data, args.rounds))
+            open_entries, closed_entries = entry_counts()
+            print(f"{mode:>14} {result['punches_per_second']:>10.1f} {result['p50']:>9.1f} "
+                  f"{result['p95']:>9.1f} {result['errors']:>7} {result['commits']:>8} {open_entries:>5}/{closed_entries:<6}")
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
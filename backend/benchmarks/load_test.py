@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Load test that replays a shift change against the full API over HTTP:
+
+1. login wave:       every employee logs in within --login-seconds
+2. clock-in storm:   every employee clocks in within --storm-seconds, while
+                     managers poll the dashboards every --poll-seconds
+3. clock-out storm:  the same, clocking out
+4. vacation flow:    every employee files a request within
+                     --vacation-seconds, then managers approve them all within
+                     the same window
+
+Data is seeded directly into the database at --database-url (a fresh SQLite
+file by default; a local Postgres works too), and the app is served by
+uvicorn in-process unless --base-url points at a running server using the
+same database. Arrival times come from a seeded RNG, so runs are repeatable.
+
+For every endpoint it prints the request count, errors, throughput and
+p50/p95/p99 latency. --save-baseline stores the numbers in
+benchmarks/baselines/load_test.json, keyed by database backend; later runs
+print the p95 change against that baseline and exit with status 1 when an
+endpoint's p95 rises by more than both --max-regression and --noise-ms. The
+same gate runs under pytest with `pytest -m load`, using the parameters
+stored with the baseline.
+
+Load-test users are seeded with the cheapest bcrypt cost, so the login wave
+measures the login path rather than a queue behind the hashing pool.
+
+Usage: python -m benchmarks.load_test [--users 200] [--storm-seconds 60]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load.db')}"
+)
+# Single process, no Redis needed
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("PRESENCE_BACKEND", "memory")
+
+import httpx  # noqa: E402
+from passlib.hash import bcrypt  # noqa: E402
+from sqlalchemy import delete, select  # noqa: E402
+
+from app.core.database import SessionLocal, get_engine  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.models import (Base, DailyHours, Location, TimeEntry, User,  # noqa: E402
+                        VacationRequest)
+from app.models.user import UserRole  # noqa: E402
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "load_test.json"
+PASSWORD = "loadtest123"
+# Lowest cost bcrypt accepts; real accounts keep the default
+BCRYPT_ROUNDS = 4
+EMAIL_DOMAIN = "loadtest.timetrack.com"
+API = "/api/v1"
+
+
+class Recorder:
+    """Latencies and failures per endpoint, plus the time each one was active"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.active_seconds: Dict[str, float] = defaultdict(float)
+
+    async def request(
+        self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs
+    ) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, API + url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        self.latencies[endpoint].append((time.perf_counter() - start) * 1000)
+        if response is None or response.status_code >= 400:
+            self.errors[endpoint] += 1
+            return None
+        return response
+
+    def phase(self, endpoints: List[str], seconds: float) -> None:
+        for endpoint in endpoints:
+            self.active_seconds[endpoint] += seconds
+
+    def summary(self) -> Dict[str, dict]:
+        results = {}
+        for endpoint, latencies in self.latencies.items():
+            if len(latencies) > 1:
+                percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+            else:
+                percentiles = latencies * 99
+            results[endpoint] = {
+                "requests": len(latencies),
+                "errors": self.errors[endpoint],
+                "rps": len(latencies) / max(self.active_seconds[endpoint], 1e-9),
+                "p50": percentiles[49],
+                "p95": percentiles[94],
+                "p99": percentiles[98],
+            }
+        return results
+
+
+def seed(users: int, managers: int) -> dict:
+    """
+    Create (or reuse) the load-test users and a location, and clear their
+    entries and requests from earlier runs
+    """
+    Base.metadata.create_all(bind=get_engine())
+    db = SessionLocal()
+    try:
+        location = db.scalar(select(Location).where(Location.name == "Load Test Site"))
+        if location is None:
+            location = Location(
+                name="Load Test Site",
+                address="1 Load Test Way",
+                latitude=40.7128,
+                longitude=-74.0060,
+                radius_meters=200,
+            )
+            db.add(location)
+
+        existing = set(
+            db.scalars(select(User.email).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+        )
+        hashed = bcrypt.using(rounds=BCRYPT_ROUNDS).hash(PASSWORD)
+        accounts = [(f"employee{i}", UserRole.EMPLOYEE) for i in range(users)]
+        accounts += [(f"manager{i}", UserRole.MANAGER) for i in range(managers)]
+        db.add_all(
+            User(
+                email=f"{name}@{EMAIL_DOMAIN}",
+                username=f"loadtest-{name}",
+                full_name=f"Load Test {name}",
+                hashed_password=hashed,
+                role=role,
+            )
+            for name, role in accounts
+            if f"{name}@{EMAIL_DOMAIN}" not in existing
+        )
+        db.flush()
+
+        user_ids = select(User.id).where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+        for model in (TimeEntry, VacationRequest, DailyHours):
+            db.execute(delete(model).where(model.user_id.in_(user_ids)))
+        db.commit()
+
+        return {
+            "location": (location.id, location.latitude, location.longitude),
+            "employees": [f"employee{i}@{EMAIL_DOMAIN}" for i in range(users)],
+            "managers": [f"manager{i}@{EMAIL_DOMAIN}" for i in range(managers)],
+        }
+    finally:
+        db.close()
+
+
+def bearer(email: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': email})}"}
+
+
+async def login_wave(
+    client, recorder: Recorder, employees: List[str], window: float, rng: random.Random
+) -> None:
+    """Each employee logs in once at a random moment within the window"""
+    endpoint = "POST /auth/login"
+
+    async def login(email: str, delay: float):
+        await asyncio.sleep(delay)
+        await recorder.request(
+            client, endpoint, "POST", "/auth/login", json={"email": email, "password": PASSWORD}
+        )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login(email, rng.uniform(0, window)) for email in employees))
+    recorder.phase([endpoint], time.perf_counter() - start)
+
+
+async def punch_storm(
+    client, recorder: Recorder, kind: str, employees: List[dict], location, window: float,
+    rng: random.Random,
+) -> None:
+    """Each employee punches once at a random moment within the window"""
+    endpoint = f"POST /time-entries/{kind}"
+    location_id, latitude, longitude = location
+    body = {"latitude": latitude, "longitude": longitude, "accuracy": 5.0}
+    if kind == "clock-in":
+        body["location_id"] = location_id
+
+    async def punch(headers: dict, delay: float):
+        await asyncio.sleep(delay)
+        await recorder.request(
+            client, endpoint, "POST", f"/time-entries/{kind}", headers=headers, json=body
+        )
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(punch(headers, rng.uniform(0, window)) for headers in employees)
+    )
+    recorder.phase([endpoint], time.perf_counter() - start)
+
+
+DASHBOARD_ENDPOINTS = [
+    "/dashboard/active-employees",
+    "/dashboard/pending-vacations",
+    "/time-entries/active-employees",
+]
+
+
+async def dashboard_polling(
+    client, recorder: Recorder, managers: List[dict], interval: float, stop: asyncio.Event,
+    rng: random.Random,
+) -> None:
+    """Managers refresh their dashboards every interval until stopped"""
+
+    async def poll(headers: dict):
+        await asyncio.sleep(rng.uniform(0, interval))
+        while not stop.is_set():
+            for url in DASHBOARD_ENDPOINTS:
+                await recorder.request(client, f"GET {url}", "GET", url, headers=headers)
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    start = time.perf_counter()
+    await asyncio.gather(*(poll(headers) for headers in managers))
+    recorder.phase([f"GET {url}" for url in DASHBOARD_ENDPOINTS], time.perf_counter() - start)
+
+
+async def storm_with_polling(client, recorder, kind, employees, managers, location, args, rng):
+    stop = asyncio.Event()
+    polling = asyncio.create_task(
+        dashboard_polling(client, recorder, managers, args.poll_seconds, stop, rng)
+    )
+    await punch_storm(client, recorder, kind, employees, location, args.storm_seconds, rng)
+    stop.set()
+    await polling
+
+
+async def vacation_flow(
+    client, recorder: Recorder, employees: List[dict], managers: List[dict], window: float,
+    rng: random.Random,
+):
+    """Each employee files a request within the window, then managers approve them within it"""
+    create, approve = "POST /vacation-requests/", "PUT /vacation-requests/{id}/approve"
+    day = (date.today() + timedelta(days=30)).isoformat()
+
+    async def later(delay: float, *args, **kwargs):
+        await asyncio.sleep(delay)
+        return await recorder.request(client, *args, **kwargs)
+
+    start = time.perf_counter()
+    created = await asyncio.gather(
+        *(
+            later(
+                rng.uniform(0, window), create, "POST", "/vacation-requests/", headers=headers,
+                json={"date": day, "reason": "Load test"},
+            )
+            for headers in employees
+        )
+    )
+    recorder.phase([create], time.perf_counter() - start)
+
+    request_ids = [response.json()["id"] for response in created if response is not None]
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            later(
+                rng.uniform(0, window), approve, "PUT", f"/vacation-requests/{request_id}/approve",
+                headers=managers[i % len(managers)],
+            )
+            for i, request_id in enumerate(request_ids)
+        )
+    )
+    recorder.phase([approve], time.perf_counter() - start)
+
+
+async def run(base_url: str, data: dict, args) -> Recorder:
+    rng = random.Random(args.seed)
+    recorder = Recorder()
+    employees = [bearer(email) for email in data["employees"]]
+    managers = [bearer(email) for email in data["managers"]]
+    limits = httpx.Limits(max_connections=args.connections)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        print(f"login wave over {args.login_seconds:g}s...")
+        await login_wave(client, recorder, data["employees"], args.login_seconds, rng)
+        for kind in ("clock-in", "clock-out"):
+            print(f"{kind} storm over {args.storm_seconds:g}s with dashboard polling...")
+            await storm_with_polling(
+                client, recorder, kind, employees, managers, data["location"], args, rng
+            )
+        print("vacation requests and approvals...")
+        await vacation_flow(client, recorder, employees, managers, args.vacation_seconds, rng)
+    return recorder
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_in_thread():
+    """Start the real application under uvicorn; returns (base_url, server, thread)"""
+    import uvicorn
+
+    from main import create_app
+
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(), host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server, thread
+
+
+def report(
+    results: Dict[str, dict], baseline: Optional[Dict[str, dict]], max_regression: float,
+    noise_ms: float,
+) -> bool:
+    """
+    Print the results table; False when an endpoint's p95 regressed past the
+    limit. Increases of less than noise_ms are run-to-run jitter, never
+    regressions.
+    """
+    ok = True
+    print(f"\n{'endpoint':<40} {'reqs':>6} {'errors':>6} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'p95 vs baseline':>16}")
+    for endpoint, stats in sorted(results.items()):
+        change = ""
+        previous = (baseline or {}).get(endpoint)
+        if previous:
+            delta = stats["p95"] / previous["p95"] - 1
+            change = f"{delta:+.0%}"
+            if delta > max_regression and stats["p95"] - previous["p95"] > noise_ms:
+                change += " REGRESSED"
+                ok = False
+        print(f"{endpoint:<40} {stats['requests']:>6} {stats['errors']:>6} {stats['rps']:>8.1f} "
+              f"{stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['p99']:>8.1f} {change:>16}")
+    return ok
+
+
+# Run parameters stored with a baseline; a gate run replays them
+BASELINE_PARAMETERS = ("users", "managers", "login_seconds", "storm_seconds", "vacation_seconds", "poll_seconds")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=200, help="employees in the shift")
+    parser.add_argument("--managers", type=int, default=5)
+    parser.add_argument("--login-seconds", type=float, default=10.0)
+    parser.add_argument("--storm-seconds", type=float, default=60.0)
+    parser.add_argument("--vacation-seconds", type=float, default=10.0)
+    parser.add_argument("--poll-seconds", type=float, default=5.0)
+    parser.add_argument("--connections", type=int, default=100, help="client connection limit")
+    parser.add_argument("--seed", type=int, default=42, help="RNG seed for arrival times")
+    parser.add_argument("--base-url", help="target a running server instead of an in-process one")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="allowed p95 increase over the baseline, as a fraction")
+    parser.add_argument("--noise-ms", type=float, default=25.0,
+                        help="p95 increases below this many ms never count as regressions")
+    return parser.parse_args(argv)
+
+
+def baseline_args(baseline: dict) -> List[str]:
+    """Command-line arguments that repeat the run a baseline was saved from"""
+    return [f"--{name.replace('_', '-')}={baseline[name]}" for name in BASELINE_PARAMETERS]
+
+
+def load_baselines() -> Dict[str, dict]:
+    return json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+
+
+def run_load_test(args: argparse.Namespace) -> Dict[str, dict]:
+    """Seed, serve the app unless --base-url is given, and replay the shift change"""
+    data = seed(args.users, args.managers)
+
+    server = thread = None
+    base_url = args.base_url
+    if base_url is None:
+        base_url, server, thread = serve_in_thread()
+    try:
+        recorder = asyncio.run(run(base_url, data, args))
+    finally:
+        if server is not None:
+            server.should_exit = True
+            thread.join()
+    return recorder.summary()
+
+
+def main():
+    args = parse_args()
+    backend = get_engine().url.get_backend_name()
+    print(f"database: {backend}, users: {args.users}, managers: {args.managers}")
+
+    results = run_load_test(args)
+    baselines = load_baselines()
+    ok = report(
+        results, baselines.get(backend, {}).get("endpoints"), args.max_regression, args.noise_ms
+    )
+
+    if args.save_baseline:
+        baselines[backend] = {
+            **{name: getattr(args, name) for name in BASELINE_PARAMETERS},
+            "endpoints": {
+                endpoint: {key: round(value, 2) for key, value in stats.items()}
+                for endpoint, stats in sorted(results.items())
+            },
+        }
+        BASELINE_PATH.parent.mkdir(exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2) + "\n")
+        print(f"\nbaseline saved to {BASELINE_PATH}")
+    elif not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
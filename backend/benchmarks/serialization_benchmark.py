@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Serialization cost of a TimeEntryResponse list at 100, 1k and 10k rows:
+
+- fastapi:     response_model validation of ORM objects + JSONResponse (json.dumps)
+- typeadapter: precompiled TypeAdapter validate + dump_json (json_list_response)
+- rows+orjson: Row tuples projected to dicts + ORJSONResponse (json_rows_response)
+
+Only serialization is timed; rows are loaded from a SQLite database first.
+
+Usage: python -m benchmarks.serialization_benchmark [--sizes 100 1000 10000]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.api.v1.time_entries import TIME_ENTRY_RESPONSE_COLUMNS  # noqa: E402
+from app.core.database import SessionLocal, get_engine  # noqa: E402
+from app.core.serialization import dump_list, rows_to_dicts  # noqa: E402
+from app.models import Base, Location, TimeEntry, User  # noqa: E402
+from app.schemas.time_entry import TimeEntryResponse  # noqa: E402
+
+
+def seed(db, rows: int) -> None:
+    if db.scalar(select(TimeEntry.id).limit(1)) is not None:
+        return
+    user = User(email="bench@timetrack.com", username="bench", full_name="Bench", hashed_password="x")
+    location = Location(name="Bench", address="x", latitude=40.7, longitude=-74.0)
+    db.add_all([user, location])
+    db.flush()
+    start = datetime(2025, 1, 1, 8)
+    db.execute(
+        TimeEntry.__table__.insert(),
+        [
+            {
+                "user_id": user.id,
+                "location_id": location.id,
+                "type": "CLOCK_IN",
+                "clock_in_time": start + timedelta(hours=i),
+                "clock_in_latitude": 40.7,
+                "clock_in_longitude": -74.0,
+                "clock_in_accuracy": 5.0,
+                "clock_out_time": start + timedelta(hours=i, minutes=475),
+                "clock_out_latitude": 40.7,
+                "clock_out_longitude": -74.0,
+                "notes": f"entry {i}",
+            }
+            for i in range(rows)
+        ],
+    )
+    db.commit()
+
+
+def median_ms(fn, repeat: int) -> float:
+    """Median milliseconds per call"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=get_engine())
+    field = create_response_field(
+        name="Response_bench", type_=List[TimeEntryResponse], mode="serialization"
+    )
+
+    loop = asyncio.new_event_loop()
+    db = SessionLocal()
+    try:
+        seed(db, max(args.sizes))
+        print(f"{'rows':>7} {'fastapi ms':>11} {'typeadapter ms':>15} {'rows+orjson ms':>15} {'best speedup':>13}")
+        for size in args.sizes:
+            entries = db.scalars(select(TimeEntry).order_by(TimeEntry.id).limit(size)).all()
+            rows = db.execute(
+                select(*TIME_ENTRY_RESPONSE_COLUMNS).order_by(TimeEntry.id).limit(size)
+            ).all()
+
+            def fastapi_default():
+                content = loop.run_until_complete(
+                    serialize_response(field=field, response_content=entries)
+                )
+                return JSONResponse(content).body
+
+            baseline = median_ms(fastapi_default, args.repeat)
+            adapter = median_ms(lambda: dump_list(TimeEntryResponse, entries), args.repeat)
+            projected = median_ms(lambda: ORJSONResponse(rows_to_dicts(rows)).body, args.repeat)
+            print(f"{size:>7} {baseline:>11.2f} {adapter:>15.2f} {projected:>15.2f} "
+                  f"{baseline / min(adapter, projected):>12.1f}x")
+    finally:
+        db.close()
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
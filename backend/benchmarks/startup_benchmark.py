@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: time to import the app, build it with create_app() and
+serve the first /health request (lifespan included), each measured in a fresh
+interpreter so nothing is warm.
+
+With --budget-ms the script exits non-zero when the median total exceeds the
+budget, so it can guard against cold-start regressions in CI.
+
+Usage: python -m benchmarks.startup_benchmark [--runs 10] [--budget-ms 3000]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter and prints one JSON line of phase timings
+PROBE = """
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+app = main.create_app()
+created = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    client.get("/health").raise_for_status()
+    served = time.perf_counter()
+print(json.dumps({
+    "import": (imported - start) * 1000,
+    "create_app": (created - imported) * 1000,
+    "first_request": (served - created) * 1000,
+    "total": (served - start) * 1000,
+}))
+"""
+
+PHASES = ("import", "create_app", "first_request", "total")
+
+
+def child_env(database_url: str) -> dict:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = database_url
+    env.setdefault("CACHE_BACKEND", "memory")
+    env.setdefault("TRUSTED_HOSTS", "testserver")
+    return env
+
+
+def run_once(env: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env: dict, top: int):
+    """Top-level packages with the largest cumulative import time (python -X importtime)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)", line)
+        if match and "." not in match.group(2) and not match.group(2).startswith("_"):
+            rows.append((int(match.group(1)) / 1000, match.group(2)))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--database-url",
+        default=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+    )
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="fail if the median total exceeds this")
+    parser.add_argument("--top-imports", type=int, default=10)
+    args = parser.parse_args()
+
+    env = child_env(args.database_url)
+    runs = [run_once(env) for _ in range(args.runs)]
+
+    print(f"runs: {args.runs}")
+    print(f"{'phase':>14} {'min ms':>9} {'median ms':>10} {'max ms':>9}")
+    for phase in PHASES:
+        values = [run[phase] for run in runs]
+        print(f"{phase:>14} {min(values):>9.1f} {statistics.median(values):>10.1f} {max(values):>9.1f}")
+
+    if args.top_imports:
+        print("\nslowest imports (cumulative):")
+        for millis, module in slowest_imports(env, args.top_imports):
+            print(f"{millis:>9.1f} ms  {module}")
+
+    median_total = statistics.median(run["total"] for run in runs)
+    if args.budget_ms is not None and median_total > args.budget_ms:
+        print(f"\nFAIL: median startup {median_total:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
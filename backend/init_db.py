@@ -1,20 +1,61 @@
 #!/usr/bin/env python3
 """
 Database initialization script for TimeTrack Pro
-Creates sample users, locations, and other data for testing
+Applies the Alembic migrations, then creates sample users, locations, and
+other data for testing
 """
 
-from app.core.database import SessionLocal, engine
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.core.database import SessionLocal, get_engine
 from app.core.security import get_password_hash
-from app.models import Base
 from app.models.location import Location
 from app.models.user import User, UserRole
 
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Newest first: a table or index each revision added. Earlier versions of this
+# script built the tables with create_all and recorded no revision.
+REVISION_MARKERS = [
+    ("0004", "vacation_requests", "ix_vacation_requests_date"),
+    ("0003", "daily_hours", None),
+    ("0002", "time_entries", "ix_time_entries_user_open"),
+    ("0001", "users", None),
+]
+
+
+def unversioned_revision(engine):
+    """Revision an unversioned schema matches, or None if it is versioned or empty"""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    if "alembic_version" in tables:
+        return None
+    for revision, table, index in REVISION_MARKERS:
+        if table not in tables:
+            continue
+        if index is None or index in {i["name"] for i in inspector.get_indexes(table)}:
+            return revision
+    return None
+
+
+def migrate():
+    """Bring the schema to the latest revision (alembic upgrade head)"""
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    revision = unversioned_revision(get_engine())
+    if revision is not None:
+        print(f"✅ Stamped existing schema as revision {revision}")
+        command.stamp(config, revision)
+    command.upgrade(config, "head")
+
 
 def init_db():
     """Initialize database with sample data"""
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    migrate()
 
     db = SessionLocal()
 
@@ -1,44 +1,100 @@
-import uvicorn
+import logging
+from contextlib import asynccontextmanager
+
 from app.api.v1.api import api_router
 from app.core.config import settings
-from app.core.database import get_db
-from fastapi import FastAPI
+from app.core.database import (AsyncSessionLocal, QueryDiagnosticsMiddleware,
+                               dispose_engines, init_async_engine)
+from app.core.etag import ETAG_HEADER
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, metrics
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.services.location_registry import location_registry
+from app.services.presence import presence_broker
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
-app = FastAPI(
-    title="TimeTrack Pro API",
-    description="A modern, location-based employee time tracking system",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc",
-)
+logger = logging.getLogger(__name__)
+
+
+async def warm_location_registry():
+    """Preload locations so the first clock-ins skip the database"""
+    try:
+        async with AsyncSessionLocal() as db:
+            await location_registry.warm(db)
+    except Exception as exc:
+        # Not fatal: the registry loads locations on demand once the DB is reachable
+        logger.warning("Location registry warm-up failed: %s", exc)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the database engine on startup and release its pool on shutdown"""
+    init_async_engine()
+    await warm_location_registry()
+    await presence_broker.start()
+    yield
+    await presence_broker.stop()
+    await dispose_engines()
+
+
+def create_app() -> FastAPI:
+    """Build the API application; nothing here touches the database"""
+    app = FastAPI(
+        title="TimeTrack Pro API",
+        description="A modern, location-based employee time tracking system",
+        version="1.0.0",
+        docs_url="/docs",
+        redoc_url="/redoc",
+        lifespan=lifespan,
+    )
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.allowed_hosts_list,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.allowed_hosts_list,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],
+    )
 
-# Trusted host middleware
-app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.trusted_hosts_list)
+    # Trusted host middleware
+    app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.trusted_hosts_list)
 
-# Include API router
-app.include_router(api_router, prefix="/api/v1")
+    # Statement recording, slow-query and N+1 logging for development and staging
+    if settings.QUERY_DIAGNOSTICS:
+        app.add_middleware(QueryDiagnosticsMiddleware)
 
+    # Per-route latency and query metrics; added last so it wraps the other middleware
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
 
-@app.get("/")
-async def root():
-    return {"message": "TimeTrack Pro API is running!"}
+    # Include API router
+    app.include_router(api_router, prefix="/api/v1")
 
+    @app.get("/")
+    async def root():
+        return {"message": "TimeTrack Pro API is running!"}
 
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    if settings.METRICS_ENABLED:
+
+        @app.get("/metrics", include_in_schema=False)
+        async def prometheus_metrics():
+            return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+    return app
+
+
+# Module-level app for `uvicorn main:app`; `uvicorn main:create_app --factory` also works
+app = create_app()
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Regenerate the daily_hours rollup from time_entries.
+Run after `alembic upgrade head` adds the table, or whenever the rollup is
+suspected to have drifted.
+"""
+
+import asyncio
+
+from app.core.database import AsyncSessionLocal, dispose_engines
+from app.services.rollup_service import RollupService
+
+
+async def rebuild_rollups():
+    async with AsyncSessionLocal() as db:
+        rows = await RollupService.rebuild(db)
+    await dispose_engines()
+    print(f"✅ Rebuilt daily_hours: {rows} rows")
+
+
+if __name__ == "__main__":
+    print("🚀 Rebuilding hours rollup...")
+    asyncio.run(rebuild_rollups())
+    print("✨ Done!")
@@ -0,0 +1,45 @@
+"""
+Shared fixtures: a throwaway SQLite database migrated to head by init_db.py
+and seeded with its sample users and locations, and a TestClient for the app.
+"""
+
+import os
+import tempfile
+
+# Settings are read at import time, so point them at local backends first
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["PRESENCE_BACKEND"] = "memory"
+os.environ["TRUSTED_HOSTS"] = "testserver,127.0.0.1"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import init_db  # noqa: E402
+from app.core.database import get_engine  # noqa: E402
+from main import create_app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def engine():
+    init_db.init_db()
+    return get_engine()
+
+
+@pytest.fixture(scope="session")
+def client(engine):
+    with TestClient(create_app()) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def manager_headers(client):
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "manager@timetrack.com", "password": "manager123"},
+    )
+    assert response.status_code == 200, response.text
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    # Authenticate once so the principal cache keeps the user query out of budgets
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+    return headers
@@ -0,0 +1,74 @@
+"""
+The dashboard endpoints load related users and locations with a fixed
+number of queries, however many rows they return.
+"""
+
+from datetime import datetime, timedelta
+from itertools import count
+
+import pytest
+from sqlalchemy import select
+
+from app.core.database import SessionLocal, query_budget
+from app.models.location import Location
+from app.models.time_entry import TimeEntry
+from app.models.user import User
+from app.models.vacation_request import VacationRequest, VacationStatus
+
+_serial = count()
+
+
+def seed_employees(n: int) -> None:
+    """n employees, each clocked in with one pending vacation request"""
+    db = SessionLocal()
+    try:
+        locations = db.scalars(select(Location)).all()
+        now = datetime.utcnow()
+        for _ in range(n):
+            serial = next(_serial)
+            user = User(
+                email=f"dashboard{serial}@timetrack.com",
+                username=f"dashboard{serial}",
+                full_name=f"Dashboard User {serial}",
+                hashed_password="x",
+            )
+            db.add(user)
+            db.flush()
+            location = locations[serial % len(locations)]
+            db.add(TimeEntry(
+                user_id=user.id,
+                location_id=location.id,
+                clock_in_time=now - timedelta(minutes=serial),
+                clock_in_latitude=location.latitude,
+                clock_in_longitude=location.longitude,
+            ))
+            db.add(VacationRequest(
+                user_id=user.id,
+                date=datetime.combine(now.date() + timedelta(days=30), datetime.min.time()),
+                reason="seed",
+                status=VacationStatus.PENDING,
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize(
+    "path, budget",
+    [
+        # open entries, then one IN query each for users and locations
+        ("/api/v1/dashboard/active-employees", 3),
+        # pending page, then one IN query for users
+        ("/api/v1/dashboard/pending-vacations?limit=1000", 2),
+    ],
+)
+def test_query_count_does_not_grow_with_rows(client, manager_headers, path, budget):
+    sizes = []
+    for n in (2, 60):
+        seed_employees(n)
+        with query_budget(budget, max_repeats=1, label=path):
+            response = client.get(path, headers=manager_headers)
+        assert response.status_code == 200, response.text
+        sizes.append(len(response.json()))
+
+    assert sizes[1] >= sizes[0] + 60
@@ -0,0 +1,37 @@
+"""
+Location responses carry an ETag derived from the response cache key: a
+matching If-None-Match is answered with 304 before any database access, and
+a write to the namespace changes the tag.
+"""
+
+import pytest
+
+from app.core.database import query_budget
+
+
+@pytest.mark.parametrize("path", ["/api/v1/locations/", "/api/v1/locations/2"])
+def test_if_none_match_revalidates_without_queries(client, manager_headers, path):
+    response = client.get(path, headers=manager_headers)
+    assert response.status_code == 200, response.text
+    etag = response.headers["ETag"]
+
+    with query_budget(0, label=path):
+        response = client.get(path, headers={**manager_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert not response.content
+
+    # a PUT to any location invalidates the namespace, so the held copy is stale
+    response = client.put(
+        "/api/v1/locations/2",
+        headers=manager_headers,
+        json={"address": f"Dock {etag[1:9]}"},
+    )
+    assert response.status_code == 200, response.text
+
+    response = client.get(path, headers={**manager_headers, "If-None-Match": etag})
+    assert response.status_code == 200, response.text
+    assert response.headers["ETag"] != etag
+    body = response.json()
+    warehouse = body if isinstance(body, dict) else next(loc for loc in body if loc["id"] == 2)
+    assert warehouse["address"] == f"Dock {etag[1:9]}"
@@ -0,0 +1,78 @@
+"""
+Geofence checks: GeofenceEngine agrees with a brute-force geodesic check,
+and POST /time-entries/clock-in and the batch punch endpoint agree on every
+position, including those within a meter of the boundary.
+"""
+
+from datetime import datetime
+
+import pytest
+from geopy.distance import geodesic
+
+from app.models.location import Location
+from app.models.time_entry import TimeEntryType
+from app.schemas.time_entry import PunchEvent
+from app.services.geofence_engine import GeofenceEngine
+from app.services.location_service import LocationService
+from app.services.punch_sync_service import PunchSyncService
+
+SITES = [
+    Location(id=1, latitude=40.7128, longitude=-74.0060, radius_meters=100, is_active=True),
+    Location(id=2, latitude=-33.8688, longitude=151.2093, radius_meters=250, is_active=True),
+    Location(id=3, latitude=64.1466, longitude=-21.9426, radius_meters=50, is_active=True),
+]
+
+
+def near_boundary(site: Location):
+    """Positions from 1% inside to 1% outside the geofence, on eight bearings"""
+    steps = 21
+    for bearing in range(0, 360, 45):
+        for step in range(steps):
+            meters = site.radius_meters * (0.99 + 0.02 * step / (steps - 1))
+            point = geodesic(meters=meters).destination((site.latitude, site.longitude), bearing)
+            yield point.latitude, point.longitude
+
+
+def test_engine_matches_brute_force_geodesic():
+    engine = GeofenceEngine(SITES)
+    for site in SITES:
+        for latitude, longitude in near_boundary(site):
+            geodesic_meters = [
+                geodesic((other.latitude, other.longitude), (latitude, longitude)).meters
+                for other in SITES
+            ]
+            distances = engine.distances(latitude, longitude)
+            for meters, distance in zip(geodesic_meters, distances.tolist()):
+                assert distance == pytest.approx(meters, rel=0.005)
+
+            nearest, distance = engine.nearest(latitude, longitude)
+            assert nearest is site
+            assert distance == pytest.approx(min(geodesic_meters), rel=0.005)
+
+            # Containment only differs within the documented 0.5% of the boundary
+            own = SITES.index(site)
+            if abs(geodesic_meters[own] - site.radius_meters) > 0.005 * site.radius_meters:
+                assert (distances[own] <= site.radius_meters) == (
+                    geodesic_meters[own] <= site.radius_meters
+                )
+
+
+@pytest.mark.parametrize("site", SITES, ids=lambda site: f"site{site.id}")
+def test_clock_in_and_batch_agree_near_boundary(site):
+    positions = list(near_boundary(site))
+    punches = [
+        PunchEvent(
+            type=TimeEntryType.CLOCK_IN,
+            timestamp=datetime.utcnow(),
+            location_id=site.id,
+            latitude=latitude,
+            longitude=longitude,
+        )
+        for latitude, longitude in positions
+    ]
+    batch_errors = PunchSyncService._check_geofences(punches, {site.id: site})
+
+    for index, (latitude, longitude) in enumerate(positions):
+        assert LocationService.is_within_geofence(latitude, longitude, site) == (
+            index not in batch_errors
+        ), (latitude, longitude)
@@ -0,0 +1,95 @@
+"""
+The group-commit writer commits a batch of writes in one transaction, and a
+write that raises leaves nothing behind in it.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models.location import Location
+from app.models.time_entry import TimeEntry
+from app.models.user import User
+from app.services.group_commit import GroupCommitWriter
+
+
+def committed_notes(prefix: str) -> set:
+    """Notes of the entries another connection can see"""
+    db = SessionLocal()
+    try:
+        return set(db.scalars(select(TimeEntry.notes).where(TimeEntry.notes.like(f"{prefix}%"))))
+    finally:
+        db.close()
+
+
+def make_write(notes: str, before_add=None, fail: bool = False):
+    async def write(db):
+        user_id = await db.scalar(select(User.id).where(User.email == "employee@timetrack.com"))
+        location = await db.scalar(select(Location).order_by(Location.id).limit(1))
+        if before_add is not None:
+            before_add()
+        now = datetime.utcnow()
+        entry = TimeEntry(
+            user_id=user_id,
+            location_id=location.id,
+            clock_in_time=now - timedelta(hours=1),
+            clock_in_latitude=location.latitude,
+            clock_in_longitude=location.longitude,
+            clock_out_time=now,
+            notes=notes,
+        )
+        db.add(entry)
+        if fail:
+            location.name = "renamed by a failed write"
+            raise ValueError(notes)
+        return entry
+
+    return write
+
+
+def run_batch(client, *writes):
+    writer = GroupCommitWriter(max_batch_size=len(writes), max_wait_ms=1000)
+
+    async def submit_all():
+        return await asyncio.gather(
+            *(writer.submit(write) for write in writes), return_exceptions=True
+        )
+
+    return client.portal.call(submit_all)
+
+
+def test_batch_commits_in_one_transaction(client):
+    seen_mid_batch = []
+    results = run_batch(
+        client,
+        make_write("batch-a"),
+        make_write("batch-b"),
+        make_write("batch-c", before_add=lambda: seen_mid_batch.append(committed_notes("batch-"))),
+    )
+
+    assert [entry.notes for entry in results] == ["batch-a", "batch-b", "batch-c"]
+    # a and b were flushed by then, but not committed
+    assert seen_mid_batch == [set()]
+    assert committed_notes("batch-") == {"batch-a", "batch-b", "batch-c"}
+
+
+def test_failed_write_rolls_back_only_its_own_changes(client):
+    results = run_batch(
+        client,
+        make_write("partial-a"),
+        make_write("partial-b", fail=True),
+        make_write("partial-c"),
+    )
+
+    assert results[0].notes == "partial-a"
+    assert isinstance(results[1], ValueError)
+    assert results[2].notes == "partial-c"
+    assert committed_notes("partial-") == {"partial-a", "partial-c"}
+    db = SessionLocal()
+    try:
+        assert db.scalar(select(Location).where(Location.name == "renamed by a failed write")) is None
+    finally:
+        db.close()
+
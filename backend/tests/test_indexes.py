@@ -0,0 +1,127 @@
+"""
+The hot query shapes are served by the indexes the migrations create, not
+by table scans. Checked with EXPLAIN QUERY PLAN on a seeded SQLite database.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, select
+
+from app.core.database import SessionLocal
+from app.core.pagination import keyset_paginate
+from app.models.location import Location
+from app.models.time_entry import TimeEntry
+from app.models.user import User
+from app.models.vacation_request import VacationRequest, VacationStatus
+from app.services.vacation_calendar_service import CALENDAR_STATUSES
+
+
+@pytest.fixture(scope="module", autouse=True)
+def seeded(engine):
+    db = SessionLocal()
+    try:
+        location = db.scalar(select(Location).limit(1))
+        start = datetime(2026, 1, 5, 8, 0)
+        for n in range(50):
+            user = User(
+                email=f"index{n}@timetrack.com",
+                username=f"index{n}",
+                full_name=f"Index User {n}",
+                hashed_password="x",
+            )
+            db.add(user)
+            db.flush()
+            for day in range(20):
+                clock_in = start + timedelta(days=day)
+                db.add(TimeEntry(
+                    user_id=user.id,
+                    location_id=location.id,
+                    clock_in_time=clock_in,
+                    clock_out_time=None if day == 19 else clock_in + timedelta(hours=8),
+                    clock_in_latitude=location.latitude,
+                    clock_in_longitude=location.longitude,
+                ))
+                db.add(VacationRequest(
+                    user_id=user.id,
+                    date=start.replace(hour=0) + timedelta(days=60 + day),
+                    reason="seed",
+                    status=VacationStatus.PENDING if day % 4 == 0 else VacationStatus.APPROVED,
+                ))
+        db.commit()
+    finally:
+        db.close()
+
+    # Production databases have planner statistics; without them SQLite picks
+    # between indexes that match the same columns arbitrarily
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+
+
+def query_plan(engine, query) -> str:
+    """
+    SQLite's EXPLAIN QUERY PLAN for the statement and parameters a select
+    actually sends. SQLite matches partial indexes against bound values, so
+    the parameters have to be the processed ones.
+    """
+    sent = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sent.append((statement, parameters))
+
+    with engine.connect() as connection:
+        event.listen(connection, "before_cursor_execute", record)
+        connection.execute(query)
+        event.remove(connection, "before_cursor_execute", record)
+        statement, parameters = sent[-1]
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return "\n".join(row[-1] for row in rows)
+
+
+HOT_QUERIES = {
+    # clock-in, clock-out and my-active
+    "ix_time_entries_user_open": select(TimeEntry).where(
+        TimeEntry.user_id == 1, TimeEntry.clock_out_time.is_(None)
+    ),
+    # my-entries
+    "ix_time_entries_user_clock_in": keyset_paginate(
+        select(TimeEntry).where(TimeEntry.user_id == 1),
+        [TimeEntry.clock_in_time, TimeEntry.id],
+        cursor=None,
+        limit=100,
+        descending=True,
+        dialect_name="sqlite",
+    ),
+    # active-employees
+    "ix_time_entries_open": select(TimeEntry).where(TimeEntry.clock_out_time.is_(None)),
+    # pending vacation requests
+    "ix_vacation_requests_pending_created": keyset_paginate(
+        select(VacationRequest).where(VacationRequest.status == VacationStatus.PENDING),
+        [VacationRequest.created_at, VacationRequest.id],
+        cursor=None,
+        limit=100,
+        descending=True,
+        dialect_name="sqlite",
+    ),
+    # my-requests
+    "ix_vacation_requests_user_created": keyset_paginate(
+        select(VacationRequest).where(VacationRequest.user_id == 1),
+        [VacationRequest.created_at, VacationRequest.id],
+        cursor=None,
+        limit=100,
+        descending=True,
+        dialect_name="sqlite",
+    ),
+    # coverage calendar
+    "ix_vacation_requests_date": select(VacationRequest.id).where(
+        VacationRequest.date >= datetime(2026, 3, 1),
+        VacationRequest.date < datetime(2026, 4, 1),
+        VacationRequest.status.in_(CALENDAR_STATUSES),
+    ),
+}
+
+
+@pytest.mark.parametrize("index_name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(engine, index_name):
+    plan = query_plan(engine, HOT_QUERIES[index_name])
+    assert index_name in plan, plan
@@ -0,0 +1,25 @@
+"""
+The shift-change load test of benchmarks/load_test.py as a regression gate.
+It takes minutes, so it only runs when selected: `pytest -m load`.
+"""
+
+import pytest
+
+from benchmarks import load_test
+
+pytestmark = pytest.mark.load
+
+
+def test_shift_change_within_baseline(engine):
+    backend = engine.url.get_backend_name()
+    baseline = load_test.load_baselines().get(backend)
+    if baseline is None:
+        pytest.skip(f"no {backend} baseline; save one with python -m benchmarks.load_test --save-baseline")
+
+    args = load_test.parse_args(load_test.baseline_args(baseline))
+    results = load_test.run_load_test(args)
+
+    assert {endpoint: stats["errors"] for endpoint, stats in results.items() if stats["errors"]} == {}
+    assert load_test.report(results, baseline["endpoints"], args.max_regression, args.noise_ms), (
+        f"p95 latency regressed by more than {args.max_regression:.0%}"
+    )
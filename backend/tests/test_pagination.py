@@ -0,0 +1,97 @@
+"""
+Keyset pagination through fetch_page: cursors walk rows that share a sort
+key without skipping or repeating any, and out-of-range or conflicting
+paging parameters are refused.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import create_access_token
+from app.models.time_entry import TimeEntry
+from app.models.user import User
+
+MY_ENTRIES = "/api/v1/time-entries/my-entries"
+
+
+@pytest.fixture(scope="module")
+def clocked_user():
+    """A user whose entries share clock-in times, and a token for them"""
+    db = SessionLocal()
+    try:
+        user = User(
+            email="pagination@timetrack.com",
+            username="pagination",
+            full_name="Pagination User",
+            hashed_password="x",
+        )
+        db.add(user)
+        db.flush()
+        # two runs of equal clock_in_time, one with fractional seconds
+        times = [datetime(2026, 5, 4, 9)] * 5 + [datetime(2026, 5, 4, 8, 30, 0, 250000)] * 4
+        times.append(datetime(2026, 5, 3, 9))
+        db.add_all([
+            TimeEntry(
+                user_id=user.id,
+                location_id=1,
+                clock_in_time=clock_in_time,
+                clock_in_latitude=40.7128,
+                clock_in_longitude=-74.0060,
+            )
+            for clock_in_time in times
+        ])
+        db.commit()
+        token = create_access_token(data={"sub": user.email})
+        return user.id, {"Authorization": f"Bearer {token}"}
+    finally:
+        db.close()
+
+
+def entries_by_clock_in(user_id: int) -> list:
+    db = SessionLocal()
+    try:
+        entries = db.query(TimeEntry).filter(TimeEntry.user_id == user_id).all()
+        return [
+            entry.id
+            for entry in sorted(entries, key=lambda entry: (entry.clock_in_time, entry.id), reverse=True)
+        ]
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4])
+def test_cursor_pages_across_equal_clock_in_times(client, clocked_user, limit):
+    user_id, headers = clocked_user
+    seen = []
+    params = {"limit": limit}
+    while True:
+        response = client.get(MY_ENTRIES, headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        page = [entry["id"] for entry in response.json()]
+        assert len(page) <= limit
+        seen.extend(page)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+        params = {"limit": limit, "cursor": cursor}
+
+    assert seen == entries_by_clock_in(user_id)
+
+
+@pytest.mark.parametrize("params", [{"limit": 0}, {"limit": 1001}, {"skip": -1}])
+def test_out_of_range_paging_is_refused(client, clocked_user, params):
+    _, headers = clocked_user
+    assert client.get(MY_ENTRIES, headers=headers, params=params).status_code == 422
+
+
+def test_cursor_and_skip_cannot_be_combined(client, clocked_user):
+    _, headers = clocked_user
+    response = client.get(MY_ENTRIES, headers=headers, params={"limit": 2})
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+
+    response = client.get(MY_ENTRIES, headers=headers, params={"cursor": cursor, "skip": 2})
+    assert response.status_code == 400, response.text
+    assert client.get(MY_ENTRIES, headers=headers, params={"cursor": cursor}).status_code == 200
@@ -0,0 +1,83 @@
+"""
+Revocation through PrincipalCache reaches other workers: a second cache
+sharing the backend, standing in for another worker, still holds the token
+when a manager changes the user, and its next request sees the change.
+"""
+
+from contextlib import contextmanager
+from itertools import count
+
+import pytest
+
+from app.core import auth
+from app.core.auth import PrincipalCache
+from app.core.config import settings
+
+_serial = count()
+
+
+@pytest.fixture(scope="module")
+def admin_headers(client):
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "admin@timetrack.com", "password": "admin123"},
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@contextmanager
+def on_worker(monkeypatch, cache: PrincipalCache):
+    """Authenticate requests through another worker's principal cache"""
+    with monkeypatch.context() as patch:
+        patch.setattr(auth, "principal_cache", cache)
+        yield
+
+
+@pytest.mark.parametrize(
+    "change, path, before, after",
+    [
+        # promoted: manager-only endpoints open up
+        ({"role": "manager"}, "/api/v1/users/", 403, 200),
+        ({"is_active": False}, "/api/v1/users/me", 200, 400),
+    ],
+    ids=["role-change", "deactivation"],
+)
+def test_change_reaches_other_worker(
+    client, admin_headers, manager_headers, monkeypatch, change, path, before, after
+):
+    serial = next(_serial)
+    email = f"principal{serial}@timetrack.com"
+    response = client.post(
+        "/api/v1/users/",
+        headers=admin_headers,
+        json={
+            "email": email,
+            "username": f"principal{serial}",
+            "full_name": f"Principal User {serial}",
+            "password": "principal123",
+        },
+    )
+    assert response.status_code == 200, response.text
+    user_id = response.json()["id"]
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": "principal123"})
+    assert response.status_code == 200, response.text
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    other_worker = PrincipalCache(
+        max_size=settings.AUTH_CACHE_MAX_SIZE,
+        ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+        backend=auth.principal_cache.backend,
+        prefix=settings.CACHE_KEY_PREFIX,
+    )
+    with on_worker(monkeypatch, other_worker):
+        assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+        assert client.get(path, headers=headers).status_code == before
+    assert client.portal.call(other_worker.get, token) is not None
+
+    response = client.put(f"/api/v1/users/{user_id}", headers=manager_headers, json=change)
+    assert response.status_code == 200, response.text
+
+    with on_worker(monkeypatch, other_worker):
+        assert client.get(path, headers=headers).status_code == after
@@ -0,0 +1,31 @@
+"""
+query_budget lets a test fail the build when an endpoint runs more
+statements than it should.
+"""
+
+import pytest
+
+from app.core.database import query_budget
+
+USERS = "/api/v1/users/"
+
+
+def test_endpoint_within_budget(client, manager_headers):
+    # one page query; the principal cache keeps authentication out of it
+    with query_budget(1, label=USERS) as log:
+        response = client.get(USERS, headers=manager_headers)
+    assert response.status_code == 200, response.text
+    assert log.count == 1
+
+
+def test_endpoint_over_budget_fails(client, manager_headers):
+    with pytest.raises(AssertionError, match="over the budget of 0"):
+        with query_budget(0, label=USERS):
+            client.get(USERS, headers=manager_headers)
+
+
+def test_repeated_statement_fails(client, manager_headers):
+    with pytest.raises(AssertionError, match="repeated a statement more than 2 times"):
+        with query_budget(10, max_repeats=2, label=USERS):
+            for skip in range(3):
+                client.get(USERS, params={"skip": skip}, headers=manager_headers)
@@ -0,0 +1,99 @@
+"""
+Read replica routing against a stale SQLite copy of the primary: reads go
+to the replica, writes (ORM flushes and bulk DML alike) go to the primary,
+and a client that just wrote reads from the primary.
+"""
+
+import os
+import sqlite3
+
+import pytest
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.database import SessionLocal, dispose_engines
+from app.models.location import Location
+
+ALL_LOCATIONS = "/api/v1/locations/all"
+
+
+def login(client, email: str, password: str) -> dict:
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def add_to_primary(*rows):
+    db = SessionLocal()
+    try:
+        db.add_all(rows)
+        db.commit()
+        return [row.id for row in rows]
+    finally:
+        db.close()
+
+
+def location_names(client, headers) -> set:
+    response = client.get(ALL_LOCATIONS, headers=headers)
+    assert response.status_code == 200, response.text
+    return {location["name"] for location in response.json()}
+
+
+@pytest.fixture
+def stale_replica(client, monkeypatch, tmp_path):
+    """Serve reads from a snapshot of the primary taken now"""
+    primary = sqlite3.connect(make_url(settings.DATABASE_URL).database)
+    replica_path = os.path.join(tmp_path, "replica.db")
+    replica = sqlite3.connect(replica_path)
+    with replica:
+        primary.backup(replica)
+    primary.close()
+    replica.close()
+
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", f"sqlite:///{replica_path}")
+    client.portal.call(dispose_engines)
+    yield
+    monkeypatch.undo()
+    client.portal.call(dispose_engines)
+
+
+def test_reads_go_to_replica_until_the_client_writes(client, stale_replica):
+    manager = login(client, "manager@timetrack.com", "manager123")
+    admin = login(client, "admin@timetrack.com", "admin123")
+    add_to_primary(Location(
+        name="Replica Lag Site", address="Primary only", latitude=0.0, longitude=0.0,
+        is_active=False,
+    ))
+
+    # both clients read the snapshot, which misses the new row
+    assert "Replica Lag Site" not in location_names(client, manager)
+    assert "Replica Lag Site" not in location_names(client, admin)
+
+    # an ORM write commits on the primary and keeps its writer there
+    response = client.post(
+        "/api/v1/locations/",
+        headers=manager,
+        json={"name": "Written Site", "address": "Primary", "latitude": 0.1, "longitude": 0.1},
+    )
+    assert response.status_code == 200, response.text
+    assert {"Replica Lag Site", "Written Site"} <= location_names(client, manager)
+    assert "Written Site" not in location_names(client, admin)
+
+
+def test_bulk_dml_counts_as_a_write(client, stale_replica):
+    admin = login(client, "admin@timetrack.com", "admin123")
+    add_to_primary(Location(
+        name="Bulk Lag Site", address="Primary only", latitude=0.0, longitude=0.0,
+        is_active=False,
+    ))
+    assert "Bulk Lag Site" not in location_names(client, admin)
+
+    # bulk-decision runs a bare UPDATE with no flush
+    response = client.post(
+        "/api/v1/vacation-requests/bulk-decision",
+        headers=admin,
+        json={"ids": [999_999_999], "decision": "approve"},
+    )
+    assert response.status_code == 200, response.text
+    assert "Bulk Lag Site" in location_names(client, admin)
+
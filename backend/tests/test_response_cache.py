@@ -0,0 +1,56 @@
+"""
+ResponseCache namespace versions: a write bumps the version so every entry
+of the namespace is missed, and a value loaded before the bump is stored
+under the old version where no reader finds it.
+"""
+
+import asyncio
+
+from app.core.cache import InMemoryCache, ResponseCache
+
+
+def run(coroutine_function):
+    return asyncio.run(coroutine_function(ResponseCache(InMemoryCache(), prefix="test")))
+
+
+def test_invalidate_bumps_the_namespace():
+    async def scenario(cache):
+        key = cache.key("manager", "locations", 0, 100)
+        before = await cache.entry_key("locations", key)
+        await cache.set(before, [{"id": 1}], ttl=60)
+        users_before = await cache.entry_key("users", key)
+        assert await cache.get(await cache.entry_key("locations", key)) == [{"id": 1}]
+
+        await cache.invalidate("locations")
+
+        after = await cache.entry_key("locations", key)
+        assert after != before
+        assert await cache.get(after) is None
+        # other namespaces keep their version
+        assert await cache.entry_key("users", key) == users_before
+
+    run(scenario)
+
+
+def test_value_loaded_before_a_write_is_stored_under_the_old_version():
+    async def scenario(cache):
+        key = cache.key("employee", "me", 7)
+        # a reader resolves the key, then a write lands while it loads
+        reader_key = await cache.entry_key("users", key)
+        await cache.invalidate("users")
+        await cache.set(reader_key, {"role": "employee"}, ttl=60)
+
+        assert await cache.get(await cache.entry_key("users", key)) is None
+        assert await cache.get(reader_key) == {"role": "employee"}
+
+    run(scenario)
+
+
+def test_emptied_backend_does_not_reissue_old_keys():
+    async def scenario(cache):
+        key = cache.key("admin", "locations")
+        before = await cache.entry_key("locations", key)
+        await cache.backend.clear()
+        assert await cache.entry_key("locations", key) != before
+
+    run(scenario)
@@ -0,0 +1,122 @@
+"""
+The daily hours rollup: entries are split at UTC midnight, manager
+corrections move an entry's contribution between rows, and
+rebuild_rollups.py reproduces the rows the endpoints maintain.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+import rebuild_rollups
+from app.core.database import SessionLocal
+from app.models.daily_hours import DailyHours
+from app.services import rollup_service
+from app.services.rollup_service import split_by_day
+
+EST = timezone(timedelta(hours=-5))
+OFFICE = {"location_id": 1, "latitude": 40.7128, "longitude": -74.0060}
+
+
+@pytest.mark.parametrize(
+    "start, end, parts",
+    [
+        (datetime(2026, 3, 2, 9), datetime(2026, 3, 2, 17), [(date(2026, 3, 2), 8 * 3600)]),
+        # ending at midnight leaves nothing on the next day
+        (datetime(2026, 3, 2, 22), datetime(2026, 3, 3), [(date(2026, 3, 2), 2 * 3600)]),
+        (
+            datetime(2026, 3, 2, 22),
+            datetime(2026, 3, 3, 6),
+            [(date(2026, 3, 2), 2 * 3600), (date(2026, 3, 3), 6 * 3600)],
+        ),
+        (
+            datetime(2026, 3, 2, 22, 30),
+            datetime(2026, 3, 4, 1, 15),
+            [(date(2026, 3, 2), 5400), (date(2026, 3, 3), 86400), (date(2026, 3, 4), 4500)],
+        ),
+        # aware times are split on UTC days
+        (datetime(2026, 3, 2, 20, tzinfo=EST), datetime(2026, 3, 2, 23, tzinfo=EST),
+         [(date(2026, 3, 3), 3 * 3600)]),
+        (datetime(2026, 3, 2, 9), datetime(2026, 3, 2, 9), []),
+    ],
+)
+def test_split_by_day(start, end, parts):
+    assert split_by_day(start, end) == parts
+
+
+@pytest.fixture(scope="module")
+def employee(client):
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "employee@timetrack.com", "password": "employee123"},
+    )
+    assert response.status_code == 200, response.text
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    user_id = client.get("/api/v1/users/me", headers=headers).json()["id"]
+    return user_id, headers
+
+
+def rollup_rows(user_id: int, month: int) -> dict:
+    db = SessionLocal()
+    try:
+        rows = db.scalars(
+            select(DailyHours).where(
+                DailyHours.user_id == user_id,
+                DailyHours.day >= date(2025, month, 1),
+                DailyHours.day < date(2025, month + 1, 1),
+            )
+        )
+        return {
+            (row.location_id, row.day.day): (row.worked_seconds, row.entry_count) for row in rows
+        }
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("upsert", [True, False], ids=["upsert", "update-or-insert"])
+def test_corrections_match_rebuild(client, manager_headers, employee, monkeypatch, upsert):
+    if not upsert:
+        monkeypatch.setattr(rollup_service, "UPSERT_DIALECTS", {})
+    month = 1 if upsert else 2
+    user_id, headers = employee
+
+    def shift(**changes) -> int:
+        response = client.post("/api/v1/time-entries/clock-in", headers=headers, json=OFFICE)
+        assert response.status_code == 200, response.text
+        entry_id = response.json()["id"]
+        response = client.post("/api/v1/time-entries/clock-out", headers=headers, json=OFFICE)
+        assert response.status_code == 200, response.text
+        correct(entry_id, **changes)
+        return entry_id
+
+    def correct(entry_id: int, **changes) -> None:
+        changes = {
+            field: value.isoformat() if isinstance(value, datetime) else value
+            for field, value in changes.items()
+        }
+        response = client.put(
+            f"/api/v1/time-entries/{entry_id}", headers=manager_headers, json=changes
+        )
+        assert response.status_code == 200, response.text
+
+    night = shift(
+        clock_in_time=datetime(2025, month, 1, 22, 30),
+        clock_out_time=datetime(2025, month, 3, 1, 15),
+    )
+    assert rollup_rows(user_id, month) == {
+        (1, 1): (5400, 1), (1, 2): (86400, 1), (1, 3): (4500, 1),
+    }
+
+    shift(
+        location_id=2,
+        clock_in_time=datetime(2025, month, 2, 10),
+        clock_out_time=datetime(2025, month, 2, 12),
+    )
+    # shortening the first entry empties and drops its row for the 3rd
+    correct(night, clock_out_time=datetime(2025, month, 2, 23))
+    expected = {(1, 1): (5400, 1), (1, 2): (82800, 1), (2, 2): (7200, 1)}
+    assert rollup_rows(user_id, month) == expected
+
+    client.portal.call(rebuild_rollups.rebuild_rollups)
+    assert rollup_rows(user_id, month) == expected
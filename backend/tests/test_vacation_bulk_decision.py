@@ -0,0 +1,98 @@
+"""
+POST /vacation-requests/bulk-decision decides every pending request with one
+conditional UPDATE and reports the rest as not_pending or not_found.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.database import SessionLocal, query_budget
+from app.models.user import User
+from app.models.vacation_request import VacationRequest, VacationStatus
+
+BULK_DECISION = "/api/v1/vacation-requests/bulk-decision"
+
+
+def seed_requests(*statuses: VacationStatus) -> list:
+    db = SessionLocal()
+    try:
+        user = db.scalars(select(User).where(User.email == "employee@timetrack.com")).one()
+        day = datetime.combine(datetime.utcnow().date() + timedelta(days=60), datetime.min.time())
+        requests = [
+            VacationRequest(user_id=user.id, date=day, reason="seed", status=status)
+            for status in statuses
+        ]
+        db.add_all(requests)
+        db.commit()
+        return [request.id for request in requests]
+    finally:
+        db.close()
+
+
+def stored_request(request_id: int) -> VacationRequest:
+    db = SessionLocal()
+    try:
+        return db.get(VacationRequest, request_id)
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("decision, status", [
+    ("approve", VacationStatus.APPROVED),
+    ("reject", VacationStatus.REJECTED),
+])
+def test_bulk_decision_outcomes(client, manager_headers, decision, status):
+    first, second, decided = seed_requests(
+        VacationStatus.PENDING, VacationStatus.PENDING, VacationStatus.APPROVED
+    )
+    unknown = decided + 1_000_000
+    payload = {"ids": [first, second, first, decided, unknown, second], "decision": decision}
+    if decision == "reject":
+        payload["reason"] = "Short staffed"
+
+    # the conditional UPDATE, then one SELECT telling skipped ids apart
+    with query_budget(2, max_repeats=1, label=BULK_DECISION) as log:
+        response = client.post(BULK_DECISION, headers=manager_headers, json=payload)
+    assert response.status_code == 200, response.text
+    assert log.count == 2
+
+    body = response.json()
+    assert body["updated"] == 2
+    assert body["results"] == [
+        {"id": first, "outcome": "updated", "status": status.value},
+        {"id": second, "outcome": "updated", "status": status.value},
+        {"id": decided, "outcome": "not_pending", "status": "approved"},
+        {"id": unknown, "outcome": "not_found", "status": None},
+    ]
+
+    request = stored_request(first)
+    assert request.status == status
+    if decision == "reject":
+        assert request.rejection_reason == "Short staffed"
+    else:
+        assert request.approved_by is not None and request.rejection_reason is None
+
+
+def test_bulk_decision_all_pending_runs_one_statement(client, manager_headers):
+    ids = seed_requests(VacationStatus.PENDING, VacationStatus.PENDING)
+    with query_budget(1, label=BULK_DECISION):
+        response = client.post(
+            BULK_DECISION, headers=manager_headers, json={"ids": ids, "decision": "approve"}
+        )
+    assert response.status_code == 200, response.text
+    assert response.json()["updated"] == 2
+
+
+@pytest.mark.parametrize("payload", [
+    {"decision": "reject"},
+    {"decision": "approve", "reason": "Enjoy"},
+])
+def test_bulk_decision_reason_only_for_rejections(client, manager_headers, payload):
+    (pending,) = seed_requests(VacationStatus.PENDING)
+    response = client.post(
+        BULK_DECISION, headers=manager_headers, json={"ids": [pending], **payload}
+    )
+    assert response.status_code == 400, response.text
+    assert stored_request(pending).status == VacationStatus.PENDING